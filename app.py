@@ -7,18 +7,87 @@ import streamlit as st
 import pandas as pd
 from datetime import date, datetime
 import calendar
+import threading
+import time
 
 from utils import (
     get_default_staff_data,
-    get_month_dates,
     get_weekends,
     create_schedule_dataframe,
     create_statistics_dataframe,
     validate_staff_data,
     get_shift_symbol,
     parse_date_list,
+    parse_staff_constraints,
+    coerce_bool_column,
+    read_staff_columns,
 )
-from scheduler_logic import Scheduler, create_staff_from_dataframe
+from scheduler_logic import Scheduler, ScheduleProgress, create_staff_from_dataframe
+from schedule_cache import ScheduleCache, generate_cached
+
+
+# Attempts per Generate click; progress is shown while they run
+NUM_ATTEMPTS = 20
+
+# Seed of the first Generate click; identical inputs give the identical schedule
+# and hit the cache. "Try Another Schedule" moves on to the next seed.
+GENERATION_SEED = 0
+
+# Shared by every session of this server; None if the cache directory is unusable
+try:
+    SCHEDULE_CACHE = ScheduleCache()
+except OSError:
+    SCHEDULE_CACHE = None
+
+
+class GenerationJob:
+    """
+    Runs Scheduler.generate_schedule on a background thread so the page stays
+    responsive. The script thread polls progress and may request cancellation;
+    the worker thread never touches Streamlit.
+    """
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        holidays: set,
+        seed: int = GENERATION_SEED,
+        num_attempts: int = NUM_ATTEMPTS,
+    ):
+        self.scheduler = scheduler
+        self.holidays = holidays
+        self.seed = seed
+        self.num_attempts = num_attempts
+        self.progress = None
+        self.success = False
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        options = dict(
+            num_attempts=self.num_attempts, seed=self.seed, progress=self._on_progress
+        )
+        try:
+            if SCHEDULE_CACHE is not None:
+                self.success = generate_cached(self.scheduler, SCHEDULE_CACHE, **options)
+            else:
+                self.success = self.scheduler.generate_schedule(**options)
+        except Exception as error:
+            self.error = error
+
+    def _on_progress(self, progress: ScheduleProgress) -> bool:
+        self.progress = progress
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Stop after the current attempt and keep the best schedule found so far."""
+        self._cancel.set()
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
 
 
 def validate_staff_schedule_inputs(df, year: int, month: int) -> list:
@@ -27,81 +96,26 @@ def validate_staff_schedule_inputs(df, year: int, month: int) -> list:
     Returns a list of warning messages.
     """
     warnings = []
+    columns = read_staff_columns(df)
 
-    for idx, row in df.iterrows():
-        name = str(row.get("Name", "")).strip()
+    for name, fixed_off_str, fixed_on_str, can_do_night, can_do_24h in zip(
+        columns.names, columns.fixed_off, columns.fixed_on,
+        columns.can_do_night, columns.can_do_24h,
+    ):
         if not name:
             continue
 
-        fixed_off_str = str(row.get("FixedOff", ""))
-        fixed_on_str = str(row.get("FixedOn", ""))
-
-        # Parse FixedOff dates
-        fixed_off_dates = set()
-        if fixed_off_str and fixed_off_str.strip() and fixed_off_str != "nan":
-            fixed_off_dates = set(parse_date_list(fixed_off_str, year, month))
-
-        # Parse FixedOn dates
-        fixed_on_dates = set()
-        if fixed_on_str and fixed_on_str.strip() and fixed_on_str.lower() != "nan":
-            # Normalize separators
-            fixed_on_str = fixed_on_str.replace("，", ",").replace("；", ",").replace("：", ":")
-            for part in fixed_on_str.split(","):
-                part = part.strip()
-                if ":" in part:
-                    try:
-                        date_part = part.split(":")[0].strip()
-                        if "-" in date_part:
-                            from datetime import date as dt_date
-                            d = dt_date.fromisoformat(date_part)
-                        else:
-                            from datetime import date as dt_date
-                            d = dt_date(year, month, int(date_part))
-                        fixed_on_dates.add(d)
-                    except (ValueError, TypeError):
-                        warnings.append(f"**{name}**: Invalid date format in FixedOn: '{part}'")
-
-        # Check for conflicts: same date in both FixedOff and FixedOn
-        conflicts = fixed_off_dates & fixed_on_dates
-        if conflicts:
-            conflict_dates = ", ".join(d.strftime("%m/%d") for d in sorted(conflicts))
-            warnings.append(f"**{name}**: Date conflict - same date(s) in both FixedOff and FixedOn: {conflict_dates}")
-
-        # Check for duplicate dates in FixedOn (same day assigned twice)
-        if fixed_on_str and fixed_on_str.strip() and fixed_on_str.lower() != "nan":
-            # Normalize separators (already normalized above, but be safe)
-            normalized_on_str = fixed_on_str.replace("，", ",").replace("；", ",").replace("：", ":")
-            on_dates_list = []
-            for part in normalized_on_str.split(","):
-                part = part.strip()
-                if ":" in part:
-                    try:
-                        date_part = part.split(":")[0].strip()
-                        if "-" in date_part:
-                            from datetime import date as dt_date
-                            d = dt_date.fromisoformat(date_part)
-                        else:
-                            from datetime import date as dt_date
-                            d = dt_date(year, month, int(date_part))
-                        on_dates_list.append(d)
-                    except (ValueError, TypeError):
-                        pass
-
-            # Check duplicates
-            seen = set()
-            for d in on_dates_list:
-                if d in seen:
-                    warnings.append(f"**{name}**: Duplicate date in FixedOn: {d.strftime('%m/%d')}")
-                seen.add(d)
+        # Invalid dates, FixedOff/FixedOn conflicts and duplicate FixedOn dates
+        parsed = parse_staff_constraints(fixed_off_str, fixed_on_str, year, month)
+        for message in parsed.diagnostics:
+            warnings.append(f"**{name}**: {message}")
 
         # Check CanDoNight=False but has Night shift in FixedOn
-        can_do_night = bool(row.get("CanDoNight", True))
         if not can_do_night and fixed_on_str:
             if "Night" in fixed_on_str or "24h" in fixed_on_str:
                 warnings.append(f"**{name}**: Has Night/24h in FixedOn but 'Night OK' is unchecked")
 
         # Check CanDo24h=False but has 24h shift in FixedOn
-        can_do_24h = bool(row.get("CanDo24h", True))
         if not can_do_24h and fixed_on_str and "24h" in fixed_on_str:
             warnings.append(f"**{name}**: Has 24h in FixedOn but '24h OK' is unchecked")
 
@@ -148,6 +162,10 @@ def init_session_state():
         st.session_state.scheduler = None
     if "reschedule_changes" not in st.session_state:
         st.session_state.reschedule_changes = []
+    if "generation_job" not in st.session_state:
+        st.session_state.generation_job = None
+    if "generation_seed" not in st.session_state:
+        st.session_state.generation_seed = GENERATION_SEED
 
 
 def render_sidebar():
@@ -231,11 +249,10 @@ def render_staff_editor():
             # Ensure required columns exist
             required_cols = ["Name"]
             if all(col in uploaded_df.columns for col in required_cols):
-                # Add missing optional columns with defaults
-                if "CanDoNight" not in uploaded_df.columns:
-                    uploaded_df["CanDoNight"] = True
-                if "CanDo24h" not in uploaded_df.columns:
-                    uploaded_df["CanDo24h"] = True
+                # Add missing optional columns with defaults; text such as
+                # "False" or "0" becomes a real bool for the checkbox columns
+                uploaded_df["CanDoNight"] = coerce_bool_column(uploaded_df, "CanDoNight")
+                uploaded_df["CanDo24h"] = coerce_bool_column(uploaded_df, "CanDo24h")
                 if "FixedOff" not in uploaded_df.columns:
                     uploaded_df["FixedOff"] = ""
                 if "FixedOn" not in uploaded_df.columns:
@@ -313,7 +330,7 @@ def render_validation_warnings(year: int, month: int):
 
 
 def generate_schedule(year, month, holidays_str, day_shifts, night_shifts):
-    """Generate the schedule based on current configuration."""
+    """Start generating the schedule for the current configuration in the background."""
     # Parse holidays
     holidays = set(parse_date_list(holidays_str, year, month))
 
@@ -324,11 +341,35 @@ def generate_schedule(year, month, holidays_str, day_shifts, night_shifts):
         st.error("No valid staff members configured!")
         return False
 
-    # Debug: Show staff configurations with fixed dates and target ratio
-    import calendar
-    total_days = calendar.monthrange(year, month)[1]
+    # Create scheduler
+    scheduler = Scheduler(
+        year=year,
+        month=month,
+        staff=staff,
+        holidays=holidays,
+        day_shifts_per_day=day_shifts,
+        night_shifts_per_day=night_shifts,
+    )
+
+    # Fail fast if staff availability cannot cover the month at all
+    report = scheduler.check_feasibility()
+    if not report.feasible:
+        details = "\n".join(f"- {issue.message}" for issue in report.issues)
+        st.error(f"No valid schedule exists for this configuration:\n\n{details}")
+        return False
+
+    # Try multiple attempts to find the fairest; render_generation_progress() polls the job
+    st.session_state.generation_job = GenerationJob(
+        scheduler, holidays, seed=st.session_state.generation_seed
+    )
+    return True
+
+
+def render_staff_debug(scheduler: Scheduler):
+    """Show staff configurations with fixed dates and target ratio."""
+    total_days = len(scheduler.dates)
     with st.expander("Debug: Staff Configuration Used", expanded=False):
-        for person in staff:
+        for person in scheduler.staff.values():
             off_count = len(person.fixed_off_dates)
             ratio = person.get_target_ratio(total_days)
             ratio_text = "50%" if ratio == 0.5 else "100%"
@@ -342,34 +383,64 @@ def generate_schedule(year, month, holidays_str, day_shifts, night_shifts):
                     on_dates = ", ".join(f"{d.strftime('%m/%d')}:{s.value}" for d, s in sorted(person.fixed_on_dates.items()))
                     st.write(f"  - Fixed On: {on_dates}")
 
-    # Create scheduler
-    scheduler = Scheduler(
-        year=year,
-        month=month,
-        staff=staff,
-        holidays=holidays,
-        day_shifts_per_day=day_shifts,
-        night_shifts_per_day=night_shifts,
-    )
 
-    # Generate schedule with multiple attempts to find the fairest
-    with st.spinner("Generating optimal schedule (trying 20 combinations)..."):
-        success = scheduler.generate_schedule(num_attempts=20)
+def render_generation_progress() -> bool:
+    """
+    Show progress of the running generation job, and store its result when it
+    finishes. Returns True while the job is still running.
+    """
+    job = st.session_state.generation_job
+    if job is None:
+        return False
+
+    # Show validation warnings and the configuration being scheduled
+    render_validation_warnings(job.scheduler.year, job.scheduler.month)
+    render_staff_debug(job.scheduler)
+
+    if not job.done:
+        progress = job.progress
+        finished = progress.attempt if progress else 0
+        text = f"Generating optimal schedule: attempt {finished}/{job.num_attempts}"
+        if progress:
+            text += f" · last attempt reached: {progress.phase}"
+            if progress.best_score is not None:
+                text += f" · best fairness score: {progress.best_score:.1f}"
+        st.progress(min(finished / job.num_attempts, 1.0), text=text)
+
+        if st.button("Cancel", help="Stop and keep the best schedule found so far"):
+            job.cancel()
+        return True
+
+    st.session_state.generation_job = None
+    if job.error is not None:
+        st.error(f"Schedule generation failed: {job.error}")
+        return False
 
-    if not success:
+    if not job.success:
         st.warning("Could not achieve full coverage for all days. Review staff availability.")
+    elif job.scheduler.cancelled:
+        st.info("Generation cancelled - showing the best schedule found so far.")
+    else:
+        st.success("Schedule generated successfully!")
+        st.balloons()
+
+    store_generated_schedule(job.scheduler, job.holidays)
+    return False
+
+
+def store_generated_schedule(scheduler: Scheduler, holidays: set):
+    """Store a finished scheduler's results in session state."""
+    year, month = scheduler.year, scheduler.month
 
     # Get results
-    schedule_dict = scheduler.get_schedule_dict()
     staff_stats = scheduler.get_staff_stats()
     fairness = scheduler.get_fairness_metrics()
     coverage = scheduler.get_coverage_summary()
 
     # Create DataFrames
-    dates = get_month_dates(year, month)
-    staff_names = [p.name for p in staff]
-
-    schedule_df = create_schedule_dataframe(staff_names, dates, schedule_dict)
+    schedule_df = create_schedule_dataframe(
+        scheduler.staff_names, scheduler.dates, scheduler.schedule_matrix
+    )
     stats_df = create_statistics_dataframe(staff_stats)
 
     # Store in session state
@@ -384,8 +455,6 @@ def generate_schedule(year, month, holidays_str, day_shifts, night_shifts):
     st.session_state.scheduler = scheduler  # Store scheduler for rescheduling
     st.session_state.reschedule_changes = []  # Clear previous changes
 
-    return True
-
 
 def style_schedule_cell(val, col_name, year, month, holidays):
     """Style individual cells in the schedule."""
@@ -651,15 +720,13 @@ def render_temporary_leave():
             st.session_state.reschedule_changes = changes
 
             # Update the schedule DataFrame
-            schedule_dict = scheduler.get_schedule_dict()
             staff_stats = scheduler.get_staff_stats()
             fairness = scheduler.get_fairness_metrics()
             coverage = scheduler.get_coverage_summary()
 
-            dates = get_month_dates(year, month)
-            staff_names_list = list(scheduler.staff.keys())
-
-            st.session_state.schedule_df = create_schedule_dataframe(staff_names_list, dates, schedule_dict)
+            st.session_state.schedule_df = create_schedule_dataframe(
+                scheduler.staff_names, scheduler.dates, scheduler.schedule_matrix
+            )
             st.session_state.stats_df = create_statistics_dataframe(staff_stats)
             st.session_state.fairness_metrics = fairness
             st.session_state.coverage_summary = coverage
@@ -708,19 +775,29 @@ def main():
 
         st.divider()
 
-        # Generate button
-        if st.button(
-            "Generate Schedule",
-            type="primary",
-            disabled=not staff_valid,
-            use_container_width=True,
-        ):
-            # Show validation warnings before generating
-            render_validation_warnings(year, month)
-
-            if generate_schedule(year, month, holidays_str, day_shifts, night_shifts):
-                st.success("Schedule generated successfully!")
-                st.balloons()
+        # Generate buttons; the same inputs and seed return the cached schedule,
+        # so a different schedule needs a new seed
+        can_generate = staff_valid and st.session_state.generation_job is None
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if st.button(
+                "Generate Schedule",
+                type="primary",
+                disabled=not can_generate,
+                use_container_width=True,
+            ):
+                generate_schedule(year, month, holidays_str, day_shifts, night_shifts)
+        with col2:
+            if st.button(
+                "Try Another Schedule",
+                disabled=not can_generate or not st.session_state.schedule_generated,
+                use_container_width=True,
+                help="Generate again with a new random seed",
+            ):
+                st.session_state.generation_seed += 1
+                generate_schedule(year, month, holidays_str, day_shifts, night_shifts)
+
+        generating = render_generation_progress()
 
     with tab2:
         if st.session_state.schedule_generated:
@@ -737,6 +814,11 @@ def main():
         else:
             st.info("Generate a schedule to view statistics.")
 
+    # Poll the background generation job until it finishes
+    if generating:
+        time.sleep(0.5)
+        st.rerun()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+"""
+Cached calendar metadata for the Hospital Shift Scheduling System.
+One table per (year, month, holidays), shared by every Scheduler of that month.
+"""
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+# Day index used for dates outside the month
+NO_DAY = -1
+
+
+@dataclass(frozen=True, eq=False)
+class CalendarTable:
+    """
+    Per-day-index flags for one month. All arrays are read-only and indexed by
+    day index (0 = the 1st of the month).
+    """
+    year: int
+    month: int
+    holidays: FrozenSet[date]        # Holidays inside the month
+    dates: Tuple[date, ...]
+    date_index: Dict[date, int]
+    weekend: np.ndarray              # bool: Saturday or Sunday
+    holiday: np.ndarray              # bool
+    thursday: np.ndarray             # bool
+    weekend_pair: np.ndarray         # int8: other day of the same weekend, NO_DAY if none
+    comp_thursday: np.ndarray        # int8: Thursday before a weekend day, NO_DAY if none
+    weekend_dates: FrozenSet[date]
+    thursday_dates: Tuple[date, ...]
+    # Per day index, as dates: the other weekend day and the compensating Thursday,
+    # also when they fall outside the month; None on weekdays
+    weekend_pair_dates: Tuple[Optional[date], ...]
+    comp_thursday_dates: Tuple[Optional[date], ...]
+    non_holiday_days: Tuple[int, ...]  # Day indices that are not holidays
+    regular_days: Tuple[int, ...]      # Day indices that are neither weekend nor holiday
+
+    def index_of(self, d: date) -> int:
+        """Day index of a date, NO_DAY if it is outside the month."""
+        return self.date_index.get(d, NO_DAY)
+
+
+def get_calendar_table(year: int, month: int, holidays: Iterable[date] = ()) -> CalendarTable:
+    """Return the shared calendar table for a month and its holidays."""
+    return _build_calendar_table(year, month, frozenset(holidays))
+
+
+@lru_cache(maxsize=64)
+def _build_calendar_table(year: int, month: int, holidays: FrozenSet[date]) -> CalendarTable:
+    num_days = calendar.monthrange(year, month)[1]
+    dates = tuple(date(year, month, day) for day in range(1, num_days + 1))
+    weekdays = np.array([d.weekday() for d in dates], dtype=np.int8)
+    days = np.arange(num_days)
+
+    weekend = weekdays >= 5
+    thursday = weekdays == 3
+    holiday = np.array([d in holidays for d in dates], dtype=bool)
+
+    # Saturday pairs with the next day, Sunday with the previous one
+    weekend_pair = np.where(weekdays == 5, days + 1, np.where(weekdays == 6, days - 1, NO_DAY))
+    # Saturday's Thursday is two days back, Sunday's three
+    comp_thursday = np.where(weekdays == 5, days - 2, np.where(weekdays == 6, days - 3, NO_DAY))
+    for array in (weekend_pair, comp_thursday):
+        array[(array < 0) | (array >= num_days)] = NO_DAY
+
+    # Date offsets from Saturday / Sunday to the pair day and the Thursday
+    pair_offsets = {5: 1, 6: -1}
+    thursday_offsets = {5: -2, 6: -3}
+
+    arrays = [weekend, holiday, thursday, weekend_pair.astype(np.int8), comp_thursday.astype(np.int8)]
+    for array in arrays:
+        array.setflags(write=False)
+
+    return CalendarTable(
+        year=year,
+        month=month,
+        holidays=frozenset(d for d in holidays if (d.year, d.month) == (year, month)),
+        dates=dates,
+        date_index={d: i for i, d in enumerate(dates)},
+        weekend=arrays[0],
+        holiday=arrays[1],
+        thursday=arrays[2],
+        weekend_pair=arrays[3],
+        comp_thursday=arrays[4],
+        weekend_dates=frozenset(d for d, flag in zip(dates, weekend) if flag),
+        thursday_dates=tuple(d for d, flag in zip(dates, thursday) if flag),
+        weekend_pair_dates=tuple(
+            d + timedelta(days=pair_offsets[d.weekday()]) if d.weekday() >= 5 else None
+            for d in dates
+        ),
+        comp_thursday_dates=tuple(
+            d + timedelta(days=thursday_offsets[d.weekday()]) if d.weekday() >= 5 else None
+            for d in dates
+        ),
+        non_holiday_days=tuple(np.flatnonzero(~holiday).tolist()),
+        regular_days=tuple(np.flatnonzero(~weekend & ~holiday).tolist()),
+    )
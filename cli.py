@@ -0,0 +1,91 @@
+"""
+Command-line entry point for Hospital Shift Scheduling System.
+Generates one month without Streamlit, for cron jobs and headless servers.
+
+Usage:
+    python cli.py staff.csv --year 2026 --month 1
+    python cli.py staff.csv --year 2026 --month 10 --holidays "1-7" \\
+        --day-shifts 2 --attempts 100 --workers 4 --output-dir out/
+
+Writes schedule_YYYY_MM.csv and stats_YYYY_MM.csv (the same files the app's
+download buttons produce). Exit status: 0 on full coverage, 1 if coverage is
+incomplete, 2 if the configuration cannot be scheduled at all.
+"""
+
+import argparse
+import os
+import sys
+
+from scheduler_logic import Scheduler, create_staff_from_dataframe
+from schedule_pipeline import read_staff_csv
+from utils import create_schedule_dataframe, create_statistics_dataframe, parse_date_list
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a monthly shift schedule.")
+    parser.add_argument("staff_csv", help="Staff table (Name, CanDoNight, CanDo24h, FixedOff, FixedOn)")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--month", type=int, required=True)
+    parser.add_argument("--holidays", default="", help='Same format as the app, e.g. "1-3,15" or "2026-01-01"')
+    parser.add_argument("--day-shifts", type=int, default=1, help="Day shifts per day")
+    parser.add_argument("--night-shifts", type=int, default=1, help="Night shifts per day")
+    parser.add_argument("--attempts", type=int, default=20)
+    parser.add_argument("--engine", default="greedy", choices=["greedy", "anneal", "exact", "lns", "beam"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--time-budget-ms", type=int, default=2000, help="For the anneal and lns engines")
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args(argv)
+
+    staff = create_staff_from_dataframe(read_staff_csv(args.staff_csv), args.year, args.month)
+    if not staff:
+        print("No valid staff members configured!", file=sys.stderr)
+        return 2
+
+    scheduler = Scheduler(
+        year=args.year,
+        month=args.month,
+        staff=staff,
+        holidays=set(parse_date_list(args.holidays, args.year, args.month)),
+        day_shifts_per_day=args.day_shifts,
+        night_shifts_per_day=args.night_shifts,
+    )
+
+    report = scheduler.check_feasibility()
+    if not report.feasible:
+        print("No valid schedule exists for this configuration:", file=sys.stderr)
+        for issue in report.issues:
+            print(f"- {issue.message}", file=sys.stderr)
+        return 2
+
+    success = scheduler.generate_schedule(
+        num_attempts=args.attempts,
+        workers=args.workers,
+        seed=args.seed,
+        engine=args.engine,
+        time_budget_ms=args.time_budget_ms,
+    )
+
+    schedule_df = create_schedule_dataframe(
+        scheduler.staff_names, scheduler.dates, scheduler.schedule_matrix
+    )
+    stats_df = create_statistics_dataframe(scheduler.get_staff_stats())
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    suffix = f"{args.year}_{args.month:02d}.csv"
+    schedule_path = os.path.join(args.output_dir, f"schedule_{suffix}")
+    stats_path = os.path.join(args.output_dir, f"stats_{suffix}")
+    schedule_df.to_csv(schedule_path)
+    stats_df.to_csv(stats_path, index=False)
+
+    print(f"Schedule: {schedule_path}")
+    print(f"Statistics: {stats_path}")
+    print(f"Seed: {scheduler.seed}")
+    if not success:
+        print("Could not achieve full coverage for all days. Review staff availability.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Exact backtracking engine for the Hospital Shift Scheduling System.
+Models each open (date, shift type) slot group as a variable over staff indices,
+with integer bitset domains, forward checking and most-constrained-variable ordering.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Tuple
+
+from calendar_table import NO_DAY
+from scheduler_logic import ShiftType
+
+
+# Slot group kinds
+DAY = 0
+NIGHT = 1
+
+KIND_SHIFTS = {DAY: ShiftType.DAY, NIGHT: ShiftType.NIGHT}
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _shift_kinds(shift_type: ShiftType) -> Tuple[int, ...]:
+    """Slot kinds covered by a shift (24h covers both)."""
+    if shift_type == ShiftType.FULL_24H:
+        return (DAY, NIGHT)
+    if shift_type == ShiftType.NIGHT:
+        return (NIGHT,)
+    return (DAY,)
+
+
+class _NodeLimitReached(Exception):
+    pass
+
+
+@dataclass
+class SolverResult:
+    """Outcome of an exact search."""
+    status: str  # "feasible", "infeasible" or "unknown" (node limit reached)
+    assignments: List[Tuple[str, date, ShiftType]] = field(default_factory=list)
+    nodes: int = 0
+    night_gap: int = 0  # Night-to-night gap the search used
+    reason: str = ""
+
+
+class ExactSolver:
+    """
+    Complete search over the open slots of a Scheduler's month.
+
+    Hard rules enforced by forward checking:
+    - Fixed off dates, one shift per person per date, night capability
+    - Night-to-night (night_gap), night-to-day and day-to-day gaps
+    - Max one shift per weekend, no weekend after a Thursday night
+    - Holiday workers never work weekends
+
+    Slots of the same (date, shift type) are interchangeable, so each group is
+    branched on "person i takes a slot" / "person i is excluded from the group"
+    instead of enumerating slot permutations.
+    """
+
+    def __init__(self, scheduler, night_gap: int, node_limit: int = 20000):
+        self.scheduler = scheduler
+        self.night_gap = night_gap
+        self.node_limit = node_limit
+        self.names = list(scheduler.staff_names)
+        self.people = [scheduler.staff[name] for name in self.names]
+        self.dates = scheduler.dates
+        self.num_days = len(self.dates)
+
+        # Calendar flags by day index
+        calendar = scheduler.calendar
+        self.weekend = calendar.weekend.tolist()
+        self.holiday = calendar.holiday.tolist()
+        self.thursday = calendar.thursday.tolist()
+        self.weekend_pair = calendar.weekend_pair.tolist()
+        self.comp_thursday = calendar.comp_thursday.tolist()
+
+        self.domain = [[0] * self.num_days, [0] * self.num_days]
+        self.need = [[0] * self.num_days, [0] * self.num_days]
+        self.trail: List[Tuple[int, int, int, int]] = []
+        self.chosen: List[Tuple[int, int, int]] = []
+        self.nodes = 0
+
+        # Running counts for value ordering, seeded from fixed assignments
+        fairness = scheduler.fairness
+        self.multiplier = [fairness.normalize(p, 1) for p in self.people]
+        self.totals = [p.total_shifts for p in self.people]
+        self.day_counts = [p.day_shifts for p in self.people]
+        self.night_counts = [p.night_shifts for p in self.people]
+        self.weekend_counts = [p.weekend_shifts for p in self.people]
+        self.carry_totals = [fairness.carry_totals.get(name, 0) for name in self.names]
+        self.carry_nights = [fairness.carry_nights.get(name, 0) for name in self.names]
+        self.carry_weekends = [fairness.carry_weekends.get(name, 0) for name in self.names]
+        self.tiebreak = [scheduler.rng.random() for _ in self.people]
+
+    # ==================== MODEL ====================
+
+    def _build(self) -> str:
+        """Set up domains from the current schedule. Returns a reason if already infeasible."""
+        scheduler = self.scheduler
+        night_capable = 0
+        weekend_ok = 0
+        for i, person in enumerate(self.people):
+            if person.can_do_night:
+                night_capable |= 1 << i
+            if scheduler.fairness.is_weekend_comparable(person):
+                weekend_ok |= 1 << i
+
+        for di, d in enumerate(self.dates):
+            if self.holiday[di]:
+                continue
+            available = 0
+            for i, person in enumerate(self.people):
+                if person.is_available_on(d):
+                    available |= 1 << i
+            if self.weekend[di]:
+                available &= weekend_ok
+            occupancy = scheduler.occupancy[d]
+            self.domain[DAY][di] = available
+            self.domain[NIGHT][di] = available & night_capable
+            self.need[DAY][di] = max(0, scheduler.day_shifts_per_day - occupancy.day_count)
+            self.need[NIGHT][di] = max(0, scheduler.night_shifts_per_day - occupancy.night_count)
+
+        # Existing (fixed) assignments restrict everyone's domains
+        for (name, d), shift_type in scheduler.schedule.items():
+            di = scheduler.date_index.get(d)
+            if di is None:
+                continue
+            for kind in _shift_kinds(shift_type):
+                self._propagate(kind, di, scheduler.staff_index[name])
+
+        # The previous month's tail restricts the first days of this one
+        for (name, d), shift_type in scheduler.history.tail.items():
+            offset = (d - self.dates[0]).days
+            if offset < 0 and name in scheduler.staff_index:
+                for kind in _shift_kinds(shift_type):
+                    self._propagate_history(kind, offset, d.weekday(), scheduler.staff_index[name])
+
+        for kind in (DAY, NIGHT):
+            for di in range(self.num_days):
+                available = _popcount(self.domain[kind][di])
+                if available < self.need[kind][di]:
+                    return (
+                        f"{self.dates[di]}: {KIND_SHIFTS[kind].value} needs "
+                        f"{self.need[kind][di]} staff but only {available} can work it"
+                    )
+        return ""
+
+    def _remove(self, kind: int, di: int, bit: int) -> bool:
+        """Remove a person from a group's domain. Returns False if the group can no longer be filled."""
+        domain = self.domain[kind][di]
+        if domain & bit:
+            self.trail.append((kind, di, domain, self.need[kind][di]))
+            domain &= ~bit
+            self.domain[kind][di] = domain
+            if _popcount(domain) < self.need[kind][di]:
+                return False
+        return True
+
+    def _propagate(self, kind: int, di: int, i: int) -> bool:
+        """Forward-check the consequences of person i working a `kind` shift on day di."""
+        scheduler = self.scheduler
+        targets = [(DAY, di), (NIGHT, di)]
+
+        if kind == NIGHT:
+            for dj in range(di - self.night_gap + 1, di + self.night_gap):
+                targets.append((NIGHT, dj))
+            for dj in range(di + 1, di + scheduler.MIN_NIGHT_TO_DAY_GAP):
+                targets.append((DAY, dj))
+            if self.thursday[di]:
+                # Thursday night: Saturday and Sunday off
+                targets += [(DAY, di + 2), (NIGHT, di + 2), (DAY, di + 3), (NIGHT, di + 3)]
+        else:
+            for dj in range(di - scheduler.MIN_DAY_TO_DAY_GAP + 1, di + scheduler.MIN_DAY_TO_DAY_GAP):
+                targets.append((DAY, dj))
+            for dj in range(di - scheduler.MIN_NIGHT_TO_DAY_GAP + 1, di):
+                targets.append((NIGHT, dj))
+
+        pair = self.weekend_pair[di]
+        if pair != NO_DAY:
+            targets += [(DAY, pair), (NIGHT, pair)]
+        thursday = self.comp_thursday[di]
+        if thursday != NO_DAY:
+            targets.append((NIGHT, thursday))
+
+        bit = 1 << i
+        for target_kind, dj in targets:
+            if 0 <= dj < self.num_days and not self._remove(target_kind, dj, bit):
+                return False
+        return True
+
+    def _propagate_history(self, kind: int, offset: int, weekday: int, i: int):
+        """Like _propagate, for a shift `offset` (< 0) days before the month starts."""
+        scheduler = self.scheduler
+        targets = []
+        if kind == NIGHT:
+            targets += [(NIGHT, dj) for dj in range(offset + 1, offset + self.night_gap)]
+            targets += [(DAY, dj) for dj in range(offset + 1, offset + scheduler.MIN_NIGHT_TO_DAY_GAP)]
+            if weekday == 3:
+                targets += [(DAY, offset + 2), (NIGHT, offset + 2), (DAY, offset + 3), (NIGHT, offset + 3)]
+        else:
+            targets += [(DAY, dj) for dj in range(offset + 1, offset + scheduler.MIN_DAY_TO_DAY_GAP)]
+        if weekday == 5:
+            targets += [(DAY, offset + 1), (NIGHT, offset + 1)]
+
+        bit = 1 << i
+        for target_kind, dj in targets:
+            if 0 <= dj < self.num_days:
+                self._remove(target_kind, dj, bit)
+
+    # ==================== SEARCH ====================
+
+    def solve(self) -> SolverResult:
+        """Run the search and return the outcome."""
+        reason = self._build()
+        if reason:
+            return SolverResult("infeasible", nodes=0, night_gap=self.night_gap, reason=reason)
+
+        try:
+            found = self._search()
+        except _NodeLimitReached:
+            return SolverResult(
+                "unknown", nodes=self.nodes, night_gap=self.night_gap,
+                reason=f"Node limit of {self.node_limit} reached",
+            )
+
+        if not found:
+            return SolverResult(
+                "infeasible", nodes=self.nodes, night_gap=self.night_gap,
+                reason=f"Search space exhausted after {self.nodes} nodes",
+            )
+
+        assignments = [
+            (self.names[i], self.dates[di], KIND_SHIFTS[kind]) for kind, di, i in self.chosen
+        ]
+        return SolverResult("feasible", assignments, self.nodes, self.night_gap)
+
+    def _search(self) -> bool:
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise _NodeLimitReached()
+
+        group = self._select_group()
+        if group is None:
+            return True
+        kind, di = group
+
+        for i in self._ordered_candidates(kind, di):
+            mark = len(self.trail)
+            if self._include(kind, di, i) and self._search():
+                return True
+            self._backtrack(mark)
+            # Person i cannot take any slot of this group under the current assignment
+            if not self._remove(kind, di, 1 << i):
+                return False
+        return False
+
+    def _select_group(self):
+        """Most constrained open group: fewest spare candidates, then most open slots."""
+        best = None
+        best_key = None
+        for kind in (DAY, NIGHT):
+            for di in range(self.num_days):
+                need = self.need[kind][di]
+                if need <= 0:
+                    continue
+                key = (_popcount(self.domain[kind][di]) - need, -need)
+                if best_key is None or key < best_key:
+                    best, best_key = (kind, di), key
+        return best
+
+    def _ordered_candidates(self, kind: int, di: int) -> List[int]:
+        """Candidates in fairness order, mirroring the greedy scoring priorities."""
+        domain = self.domain[kind][di]
+        weekend = self.weekend[di]
+        candidates = [i for i in range(len(self.people)) if domain >> i & 1]
+
+        def key(i):
+            m = self.multiplier[i]
+            weekend_key = self.weekend_counts[i] + self.carry_weekends[i] if weekend else 0
+            total = self.totals[i] * m + self.carry_totals[i]
+            if kind == NIGHT:
+                night = self.night_counts[i] * m + self.carry_nights[i]
+                return (weekend_key, night, total, self.tiebreak[i])
+            night_key = 1 if self.people[i].can_do_night else 0
+            return (weekend_key, night_key, total, self.day_counts[i] * m, self.tiebreak[i])
+
+        candidates.sort(key=key)
+        return candidates
+
+    def _include(self, kind: int, di: int, i: int) -> bool:
+        self.trail.append((kind, di, self.domain[kind][di], self.need[kind][di]))
+        self.need[kind][di] -= 1
+        self.chosen.append((kind, di, i))
+        self._count(kind, di, i, 1)
+        return self._propagate(kind, di, i)
+
+    def _backtrack(self, mark: int):
+        kind, di, i = self.chosen.pop()
+        self._count(kind, di, i, -1)
+        while len(self.trail) > mark:
+            k, dj, domain, need = self.trail.pop()
+            self.domain[k][dj] = domain
+            self.need[k][dj] = need
+
+    def _count(self, kind: int, di: int, i: int, delta: int):
+        self.totals[i] += delta
+        if kind == NIGHT:
+            self.night_counts[i] += delta
+        else:
+            self.day_counts[i] += delta
+        if self.weekend[di]:
+            self.weekend_counts[i] += delta
+
+
+def solve_exact(scheduler, node_limit: int = 20000) -> SolverResult:
+    """
+    Fill the scheduler's open slots exactly. Tries the normal night-to-night gap
+    first and falls back to the emergency gap, like the greedy phases do.
+    An "infeasible" result under the emergency gap proves no valid schedule exists.
+    """
+    result = None
+    for night_gap in (scheduler.MIN_NIGHT_TO_NIGHT_GAP, scheduler.EMERGENCY_NIGHT_TO_NIGHT_GAP):
+        result = ExactSolver(scheduler, night_gap, node_limit).solve()
+        if result.status == "feasible":
+            return result
+    return result
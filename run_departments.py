@@ -0,0 +1,77 @@
+"""
+Headless batch scheduling of many departments for Hospital Shift Scheduling System.
+
+Usage:
+    python run_departments.py departments/ --year 2026 --month 3 --output-dir out/
+    python run_departments.py manifest.csv --year 2026 --month 1 --months 12 \\
+        --holidays 2026-01-01,2026-05-01 --workers 8
+
+The source is a directory of staff CSVs (one per department, named after the
+file) or a manifest CSV with columns Department, StaffCSV[, DayShifts, NightShifts].
+Writes <output-dir>/<department>/schedule_YYYY_MM.csv and <output-dir>/summary.csv.
+"""
+
+import argparse
+import os
+import sys
+
+from schedule_pipeline import load_departments, schedule_departments, summarize_departments
+from utils import export_schedule_to_csv
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate shift schedules for many departments.")
+    parser.add_argument("source", help="Directory of staff CSVs or a manifest CSV")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--month", type=int, required=True)
+    parser.add_argument("--months", type=int, default=1, help="Consecutive months per department")
+    parser.add_argument("--holidays", default="", help='Same format as the app; day numbers such as "1-3" apply to every month')
+    parser.add_argument("--attempts", type=int, default=20)
+    parser.add_argument("--engine", default="greedy", choices=["greedy", "anneal", "exact", "lns", "beam"])
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args(argv)
+
+    departments = load_departments(args.source)
+    if not departments:
+        print(f"No departments found in {args.source}", file=sys.stderr)
+        return 2
+
+    outcomes = []
+    for department, results in schedule_departments(
+        departments,
+        args.year,
+        args.month,
+        args.months,
+        holidays=args.holidays,
+        num_attempts=args.attempts,
+        engine=args.engine,
+        workers=args.workers,
+        seed=args.seed,
+    ):
+        outcomes.append((department, results))
+        if isinstance(results, Exception):
+            print(f"{department.name}: ERROR {results}")
+            continue
+
+        folder = os.path.join(args.output_dir, department.name)
+        os.makedirs(folder, exist_ok=True)
+        for result in results:
+            path = os.path.join(folder, f"schedule_{result.year}_{result.month:02d}.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(export_schedule_to_csv(result.schedule_df, result.stats_df))
+        done = sum(result.success for result in results)
+        print(f"{department.name}: {done}/{len(results)} months complete -> {folder}")
+
+    summary = summarize_departments(outcomes)
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary_path = os.path.join(args.output_dir, "summary.csv")
+    summary.to_csv(summary_path, index=False)
+    print(f"Summary: {summary_path}")
+
+    return 0 if bool(summary["Success"].all()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Headless multi-month generation for Hospital Shift Scheduling System.
+
+Usage:
+    python run_year.py staff.csv --year 2026 --output-dir schedules/
+    python run_year.py staff.csv --year 2026 --start-month 7 --months 6 \\
+        --holidays 2026-10-01,2026-10-02 --engine lns --seed 42
+
+Each month is written as soon as it is generated, while the next month runs.
+"""
+
+import argparse
+import os
+import sys
+
+from schedule_pipeline import generate_months, read_staff_csv
+from utils import export_schedule_to_csv
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate consecutive monthly shift schedules.")
+    parser.add_argument("staff_csv", help="Staff table (Name, CanDoNight, CanDo24h, FixedOff, FixedOn)")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--start-month", type=int, default=1)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--holidays", default="", help='Same format as the app; day numbers such as "1-3" apply to every month')
+    parser.add_argument("--day-shifts", type=int, default=1)
+    parser.add_argument("--night-shifts", type=int, default=1)
+    parser.add_argument("--attempts", type=int, default=20)
+    parser.add_argument("--engine", default="greedy", choices=["greedy", "anneal", "exact", "lns", "beam"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args(argv)
+
+    staff_df = read_staff_csv(args.staff_csv)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = 0
+    for result in generate_months(
+        staff_df,
+        args.year,
+        args.start_month,
+        args.months,
+        holidays=args.holidays,
+        day_shifts_per_day=args.day_shifts,
+        night_shifts_per_day=args.night_shifts,
+        num_attempts=args.attempts,
+        engine=args.engine,
+        workers=args.workers,
+        seed=args.seed,
+    ):
+        path = os.path.join(args.output_dir, f"schedule_{result.year}_{result.month:02d}.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(export_schedule_to_csv(result.schedule_df, result.stats_df))
+
+        status = "ok" if result.success else "INCOMPLETE"
+        print(f"{result.year}-{result.month:02d} {status} seed={result.seed} "
+              f"({result.elapsed:.1f}s) -> {path}")
+        if not result.success:
+            failed += 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
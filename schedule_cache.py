@@ -0,0 +1,206 @@
+"""
+On-disk result cache for Hospital Shift Scheduling System.
+Schedules are stored under a fingerprint of the normalized scheduling inputs,
+so repeating a generation with unchanged inputs is a file read.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import zipfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from scheduler_logic import Scheduler, ScheduleSnapshot
+
+
+# Bump when scheduling rules change, so results of older code are not reused
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SCHEDULE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "hospital_schedule"),
+)
+
+# generate_schedule() arguments that do not affect the result
+_IGNORED_OPTIONS = ("self", "progress", "workers")
+
+
+def schedule_fingerprint(scheduler: Scheduler, **options) -> str:
+    """
+    Content hash of everything that determines generate_schedule's result: the
+    parsed staff constraints (in roster order), in-month holidays, year/month,
+    slot counts, carried history and the generate_schedule options (with
+    defaults filled in). The worker count is left out: parallel and sequential
+    runs with the same seed produce the same schedule.
+    """
+    bound = inspect.signature(Scheduler.generate_schedule).bind(scheduler, **options)
+    bound.apply_defaults()
+    options = {k: v for k, v in bound.arguments.items() if k not in _IGNORED_OPTIONS}
+
+    history = scheduler.history
+    payload = {
+        "version": CACHE_VERSION,
+        "year": scheduler.year,
+        "month": scheduler.month,
+        "staff": [
+            [
+                person.name,
+                bool(person.can_do_night),
+                bool(person.can_do_24h),
+                sorted(d.isoformat() for d in person.fixed_off_dates),
+                sorted((d.isoformat(), s.value) for d, s in person.fixed_on_dates.items()),
+            ]
+            for person in scheduler.staff.values()
+        ],
+        "holidays": sorted(d.isoformat() for d in scheduler.calendar.holidays),
+        "day_shifts_per_day": scheduler.day_shifts_per_day,
+        "night_shifts_per_day": scheduler.night_shifts_per_day,
+        "history": {
+            "tail": sorted((name, d.isoformat(), s.value) for (name, d), s in history.tail.items()),
+            "totals": sorted(history.totals.items()),
+            "nights": sorted(history.nights.items()),
+            "weekends": sorted(history.weekends.items()),
+        },
+        "options": options,
+    }
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScheduleCache:
+    """
+    Directory of cached schedules, one compressed .npz file per fingerprint.
+    Holds at most max_entries files; the least recently used are evicted.
+    Several processes (or app users) may share one directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 500):
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_entries = max_entries
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _entries(self) -> List[str]:
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".npz")
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def get(self, key: str) -> Optional[Tuple[ScheduleSnapshot, bool, int]]:
+        """
+        Return (snapshot, success, seed) for a fingerprint, or None on a miss.
+        An unreadable entry (truncated, corrupt, missing arrays) counts as a miss
+        and is removed so the next generation rewrites it.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                snapshot = ScheduleSnapshot(
+                    staff_names=tuple(str(name) for name in data["staff_names"]),
+                    matrix=data["matrix"],
+                    last_day=data["last_day"],
+                    last_night=data["last_night"],
+                )
+                success = bool(data["success"])
+                seed = int(data["seed"])
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            return None  # Evicted by another process
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        for array in (snapshot.matrix, snapshot.last_day, snapshot.last_night):
+            array.setflags(write=False)
+        return snapshot, success, seed
+
+    def put(self, key: str, snapshot: ScheduleSnapshot, success: bool, seed: int):
+        """Store a schedule, then evict the least recently used entries over the limit."""
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    staff_names=np.array(snapshot.staff_names, dtype=str),
+                    matrix=snapshot.matrix,
+                    last_day=snapshot.last_day,
+                    last_night=snapshot.last_night,
+                    success=np.array(success),
+                    seed=np.array(seed, dtype=np.int64),
+                )
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+
+        def last_used(path: str) -> float:
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0.0
+
+        entries.sort(key=last_used)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Already evicted by another process
+
+    def clear(self):
+        """Remove every cached schedule."""
+        for path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def generate_cached(scheduler: Scheduler, cache: ScheduleCache, **options) -> bool:
+    """
+    Scheduler.generate_schedule(**options) through the cache.
+
+    On a hit the cached schedule is restored into the scheduler and its original
+    return value is returned. Runs without an explicit seed are not reproducible,
+    so they bypass the cache, as do cancelled runs.
+    """
+    if options.get("seed") is None:
+        return scheduler.generate_schedule(**options)
+
+    key = schedule_fingerprint(scheduler, **options)
+    cached = cache.get(key)
+    if cached is not None:
+        snapshot, success, seed = cached
+        if snapshot.staff_names == tuple(scheduler.staff_names) and snapshot.matrix.shape == (
+            len(scheduler.staff_names), len(scheduler.dates)
+        ):
+            scheduler.restore(snapshot)
+            scheduler.seed = seed
+            scheduler.cancelled = False
+            return success
+
+    success = scheduler.generate_schedule(**options)
+    if not scheduler.cancelled:
+        cache.put(key, scheduler.snapshot(), success, scheduler.seed)
+    return success
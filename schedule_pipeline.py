@@ -0,0 +1,370 @@
+"""
+Batch schedule generation for Hospital Shift Scheduling System.
+Chains one Scheduler per month and carries gap rules and fairness history forward,
+and schedules many departments at once on a shared process pool.
+"""
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import pandas as pd
+
+from scheduler_logic import Scheduler, ScheduleHistory, create_staff_from_dataframe
+from utils import create_schedule_dataframe, create_statistics_dataframe, parse_date_list
+
+
+@dataclass
+class MonthResult:
+    """Outcome of one month in a multi-month run."""
+    year: int
+    month: int
+    success: bool                  # Full coverage with all hard constraints met
+    schedule_df: pd.DataFrame
+    stats_df: pd.DataFrame
+    fairness: dict
+    coverage: List[dict]
+    history: ScheduleHistory       # Carry-over handed to the following month
+    seed: int
+    elapsed: float                 # Seconds spent generating this month
+
+
+# One staff table for every month, or one per (year, month)
+StaffTables = Union[pd.DataFrame, Mapping[Tuple[int, int], pd.DataFrame]]
+
+# Holiday dates, or a string in the app's format ("1-3,15", "2026-01-01"), where
+# bare day numbers apply to every month of the run
+Holidays = Union[str, Iterable[date]]
+
+
+def month_sequence(start_year: int, start_month: int, months: int) -> List[Tuple[int, int]]:
+    """(year, month) pairs of `months` consecutive months starting at the given one."""
+    first = start_year * 12 + start_month - 1
+    return [(index // 12, index % 12 + 1) for index in range(first, first + months)]
+
+
+def _month_holidays(holidays: Holidays, year: int, month: int) -> set:
+    """The holidays that fall in the given month."""
+    if isinstance(holidays, str):
+        holidays = parse_date_list(holidays, year, month)
+    return {d for d in holidays if (d.year, d.month) == (year, month)}
+
+
+def _freeze_holidays(holidays: Holidays) -> Holidays:
+    """Materialize a holiday iterable once so every month sees the same dates."""
+    return holidays if isinstance(holidays, str) else set(holidays)
+
+
+def generate_month(
+    staff_df: pd.DataFrame,
+    year: int,
+    month: int,
+    holidays: Holidays = (),
+    day_shifts_per_day: int = 1,
+    night_shifts_per_day: int = 1,
+    history: Optional[ScheduleHistory] = None,
+    num_attempts: int = 20,
+    engine: str = "greedy",
+    workers: int = 1,
+    seed: Optional[int] = None,
+    compact: bool = False,
+) -> MonthResult:
+    """
+    Generate a single month, continuing from `history` if given. With
+    compact=True the scheduler works on CompactPerson staff (less memory per
+    person, same schedule).
+    """
+    started = time.perf_counter()
+    scheduler = Scheduler(
+        year=year,
+        month=month,
+        staff=create_staff_from_dataframe(staff_df, year, month, compact=compact),
+        holidays=_month_holidays(holidays, year, month),
+        day_shifts_per_day=day_shifts_per_day,
+        night_shifts_per_day=night_shifts_per_day,
+        history=history,
+    )
+    success = scheduler.generate_schedule(
+        num_attempts=num_attempts, workers=workers, seed=seed, engine=engine
+    )
+
+    return MonthResult(
+        year=year,
+        month=month,
+        success=success,
+        schedule_df=create_schedule_dataframe(
+            scheduler.staff_names, scheduler.dates, scheduler.schedule_matrix
+        ),
+        stats_df=create_statistics_dataframe(scheduler.get_staff_stats()),
+        fairness=scheduler.get_fairness_metrics(),
+        coverage=scheduler.get_coverage_summary(),
+        history=scheduler.export_history(),
+        seed=scheduler.seed,
+        elapsed=time.perf_counter() - started,
+    )
+
+
+def _chain_months(
+    staff: StaffTables,
+    sequence: List[Tuple[int, int]],
+    history: Optional[ScheduleHistory],
+    seed: Optional[int],
+    **options,
+) -> Iterator[MonthResult]:
+    """Generate the months of `sequence` one after another, passing history along."""
+    for i, (year, month) in enumerate(sequence):
+        staff_df = staff if isinstance(staff, pd.DataFrame) else staff[(year, month)]
+        result = generate_month(
+            staff_df,
+            year,
+            month,
+            history=history,
+            seed=None if seed is None else seed + i,
+            **options,
+        )
+        history = result.history
+        yield result
+
+
+def generate_months(
+    staff: StaffTables,
+    start_year: int,
+    start_month: int = 1,
+    months: int = 12,
+    holidays: Holidays = (),
+    day_shifts_per_day: int = 1,
+    night_shifts_per_day: int = 1,
+    history: Optional[ScheduleHistory] = None,
+    num_attempts: int = 20,
+    engine: str = "greedy",
+    workers: int = 1,
+    seed: Optional[int] = None,
+) -> Iterator[MonthResult]:
+    """
+    Generate consecutive months, yielding each MonthResult as soon as it is done.
+
+    Every month starts from the previous month's exported history, so gap rules
+    hold across month boundaries and fairness is balanced on cumulative counts.
+    Months are computed on a background thread: while the caller handles one
+    month (writing files, uploading), the next one is already being generated.
+
+    Args:
+        staff: Staff table used for every month, or a mapping (year, month) ->
+            staff table. FixedOff/FixedOn day numbers refer to that month.
+        holidays: Holiday dates (other months' dates are ignored) or a string
+            in the app's format, parsed per month
+        history: Carry-over from the month before start_month, if any
+        seed: Base seed; month i of the run uses seed + i. If None, each month
+            draws its own seed (stored in MonthResult.seed).
+    """
+    sequence = month_sequence(start_year, start_month, months)
+    chain = _chain_months(
+        staff,
+        sequence,
+        history,
+        seed,
+        holidays=_freeze_holidays(holidays),
+        day_shifts_per_day=day_shifts_per_day,
+        night_shifts_per_day=night_shifts_per_day,
+        num_attempts=num_attempts,
+        engine=engine,
+        workers=workers,
+    )
+    results: "queue.Queue" = queue.Queue(maxsize=1)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Give up once the consumer has stopped iterating
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for result in chain:
+                if stop.is_set() or not put(result):
+                    return
+        except Exception as error:
+            put(error)
+
+    worker = threading.Thread(target=produce, name="schedule-pipeline", daemon=True)
+    worker.start()
+    try:
+        for _ in sequence:
+            item = results.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        worker.join()
+
+
+def generate_year(staff: StaffTables, year: int, **kwargs) -> List[MonthResult]:
+    """Generate January to December of `year`; see generate_months for options."""
+    return list(generate_months(staff, year, 1, 12, **kwargs))
+
+
+# ==================== DEPARTMENTS ====================
+
+@dataclass
+class Department:
+    """One department of a batch run: its name and staff table file."""
+    name: str
+    staff_csv: str
+    day_shifts_per_day: int = 1
+    night_shifts_per_day: int = 1
+
+
+def read_staff_csv(path: str) -> pd.DataFrame:
+    """Read a staff table in the format create_staff_from_dataframe expects."""
+    return pd.read_csv(path, dtype={"Name": str, "FixedOff": str, "FixedOn": str})
+
+
+def load_departments(source: str) -> List[Department]:
+    """
+    Load the departments of a batch run.
+
+    Args:
+        source: Either a directory, where every *.csv file is one department's
+            staff table named after the file, or a manifest CSV with columns
+            Department, StaffCSV and optionally DayShifts, NightShifts. Relative
+            StaffCSV paths are resolved against the manifest's directory.
+    """
+    if os.path.isdir(source):
+        return [
+            Department(os.path.splitext(filename)[0], os.path.join(source, filename))
+            for filename in sorted(os.listdir(source))
+            if filename.lower().endswith(".csv")
+        ]
+
+    manifest = pd.read_csv(source)
+    base = os.path.dirname(os.path.abspath(source))
+    for column in ("DayShifts", "NightShifts"):
+        if column not in manifest:
+            manifest[column] = 1
+        manifest[column] = manifest[column].fillna(1).astype(int)
+
+    return [
+        Department(
+            name=str(row["Department"]).strip(),
+            staff_csv=os.path.join(base, str(row["StaffCSV"]).strip()),
+            day_shifts_per_day=int(row["DayShifts"]),
+            night_shifts_per_day=int(row["NightShifts"]),
+        )
+        for row in manifest.to_dict("records")
+    ]
+
+
+def _schedule_department(
+    department: Department,
+    sequence: List[Tuple[int, int]],
+    holidays: Holidays,
+    num_attempts: int,
+    engine: str,
+    seed: Optional[int],
+) -> List[MonthResult]:
+    """Worker entry point: generate every month of one department, with compact staff."""
+    return list(_chain_months(
+        read_staff_csv(department.staff_csv),
+        sequence,
+        None,
+        seed,
+        holidays=holidays,
+        day_shifts_per_day=department.day_shifts_per_day,
+        night_shifts_per_day=department.night_shifts_per_day,
+        num_attempts=num_attempts,
+        engine=engine,
+        compact=True,
+    ))
+
+
+def schedule_departments(
+    departments: List[Department],
+    year: int,
+    month: int,
+    months: int = 1,
+    holidays: Holidays = (),
+    num_attempts: int = 20,
+    engine: str = "greedy",
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[Department, Union[List[MonthResult], Exception]]]:
+    """
+    Schedule every department and yield (department, results) as each finishes.
+
+    Departments run concurrently on one process pool that lives for the whole
+    batch, so each worker pays the pandas/scheduler import cost only once.
+    A department that raises is yielded with the exception instead of results,
+    and the rest of the batch continues.
+
+    Args:
+        months: Consecutive months per department, starting at year/month
+        holidays: As for generate_months
+        workers: Pool size; defaults to the CPU count. With 1, departments run
+            in this process.
+    """
+    sequence = month_sequence(year, month, months)
+    holidays = _freeze_holidays(holidays)
+    workers = workers or os.cpu_count() or 1
+    args = (sequence, holidays, num_attempts, engine, seed)
+
+    if workers <= 1 or len(departments) <= 1:
+        for department in departments:
+            try:
+                yield department, _schedule_department(department, *args)
+            except Exception as error:
+                yield department, error
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(departments))) as executor:
+        futures = {
+            executor.submit(_schedule_department, department, *args): department
+            for department in departments
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as error:
+                yield futures[future], error
+
+
+def summarize_departments(
+    outcomes: Iterable[Tuple[Department, Union[List[MonthResult], Exception]]]
+) -> pd.DataFrame:
+    """One summary row per department and month, sorted by department."""
+    rows = []
+    for department, results in outcomes:
+        if isinstance(results, Exception):
+            rows.append({"Department": department.name, "Success": False, "Error": str(results)})
+            continue
+        for result in results:
+            rows.append({
+                "Department": department.name,
+                "Year": result.year,
+                "Month": result.month,
+                "Success": result.success,
+                "Staff": len(result.stats_df),
+                "TotalStdev": round(result.fairness.get("total_shifts_stdev", 0), 3),
+                "NightStdev": round(result.fairness.get("night_shifts_stdev", 0), 3),
+                "WeekendStdev": round(result.fairness.get("weekend_shifts_stdev", 0), 3),
+                "Seed": result.seed,
+                "Seconds": round(result.elapsed, 2),
+                "Error": "",
+            })
+
+    df = pd.DataFrame(rows, columns=[
+        "Department", "Year", "Month", "Success", "Staff", "TotalStdev",
+        "NightStdev", "WeekendStdev", "Seed", "Seconds", "Error",
+    ])
+    return df.sort_values(["Department", "Year", "Month"], kind="stable").reset_index(drop=True)
@@ -3,11 +3,18 @@ Core Scheduler Logic for Hospital Shift Scheduling System.
 Implements the scheduling algorithm with all constraints and fairness rules.
 """
 
+from bisect import bisect_left, insort
 from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from enum import Enum
+import math
 import random
+import time
+
+import numpy as np
+
+from calendar_table import NO_DAY, CalendarTable, get_calendar_table
 
 
 class ShiftType(Enum):
@@ -25,6 +32,24 @@ SHIFT_WEIGHTS = {
 }
 
 
+# Cell codes of the staff x day schedule matrix (0 = no shift)
+NO_SHIFT = 0
+SHIFT_CODES = {
+    ShiftType.DAY: 1,
+    ShiftType.NIGHT: 2,
+    ShiftType.FULL_24H: 3,
+}
+CODE_SHIFTS = {code: shift_type for shift_type, code in SHIFT_CODES.items()}
+
+# Shift labels accepted in FixedOn strings ("1:Day,5:Night")
+FIXED_ON_SHIFTS = {shift_type.value: shift_type for shift_type in ShiftType}
+
+# Weight per cell code, for vectorized weighted totals
+CODE_WEIGHTS = np.array(
+    [0] + [SHIFT_WEIGHTS[CODE_SHIFTS[code]] for code in sorted(CODE_SHIFTS)], dtype=np.int16
+)
+
+
 # Threshold for determining half-month (days off >= this means 50% target)
 HALF_MONTH_THRESHOLD = 14
 
@@ -97,6 +122,416 @@ class Person:
         }
 
 
+class DayMask:
+    """
+    Set of dates stored as a bitmask over a month's day indices.
+    Supports the set operations the scheduler uses (in, add, discard, len,
+    iteration); dates outside the month fall back to a small regular set.
+    """
+    __slots__ = ("date_index", "dates", "mask", "outside")
+
+    def __init__(self, calendar: CalendarTable, dates: Iterable[date] = ()):
+        self.date_index = calendar.date_index
+        self.dates = calendar.dates
+        self.mask = 0
+        self.outside: Set[date] = set()
+        for d in dates:
+            self.add(d)
+
+    def __contains__(self, d) -> bool:
+        i = self.date_index.get(d)
+        if i is None:
+            return d in self.outside
+        return self.mask >> i & 1 == 1
+
+    def add(self, d: date):
+        i = self.date_index.get(d)
+        if i is None:
+            self.outside.add(d)
+        else:
+            self.mask |= 1 << i
+
+    def discard(self, d: date):
+        i = self.date_index.get(d)
+        if i is None:
+            self.outside.discard(d)
+        else:
+            self.mask &= ~(1 << i)
+
+    def clear(self):
+        self.mask = 0
+        if self.outside:
+            self.outside = set()
+
+    def __len__(self) -> int:
+        return bin(self.mask).count("1") + len(self.outside)
+
+    def __iter__(self) -> Iterator[date]:
+        mask = self.mask
+        i = 0
+        while mask:
+            if mask & 1:
+                yield self.dates[i]
+            mask >>= 1
+            i += 1
+        yield from self.outside
+
+    def __repr__(self) -> str:
+        return f"DayMask({sorted(self)})"
+
+
+class CompactPerson:
+    """
+    Slotted variant of Person for one month. Fixed off and assigned dates are
+    DayMask bitmasks over the month's day indices, so availability and
+    "already assigned" checks are single bit operations and
+    reset_monthly_stats() does not allocate. Drop-in replacement for Person
+    in a Scheduler of the same month.
+    """
+    __slots__ = (
+        "name", "can_do_night", "can_do_24h", "fixed_off_dates", "fixed_on_dates",
+        "total_shifts", "day_shifts", "night_shifts", "shifts_24h", "weekend_shifts",
+        "holiday_shifts", "weighted_total", "target_shifts",
+        "last_day_shift", "last_night_shift", "assigned_dates",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        calendar: CalendarTable,
+        can_do_night: bool = True,
+        can_do_24h: bool = True,
+        fixed_off_dates: Iterable[date] = (),
+        fixed_on_dates: Dict[date, ShiftType] = None,
+    ):
+        self.name = name
+        self.can_do_night = can_do_night
+        self.can_do_24h = can_do_24h
+        self.fixed_off_dates = DayMask(calendar, fixed_off_dates)
+        self.fixed_on_dates = dict(fixed_on_dates or {})
+        self.assigned_dates = DayMask(calendar)
+        self.target_shifts = 0
+        self.reset_monthly_stats()
+
+    @classmethod
+    def from_person(cls, person: Person, calendar: CalendarTable) -> "CompactPerson":
+        """Compact copy of a Person's configuration (stats are not copied)."""
+        return cls(
+            person.name, calendar, person.can_do_night, person.can_do_24h,
+            person.fixed_off_dates, person.fixed_on_dates,
+        )
+
+    def reset_monthly_stats(self):
+        """Reset stats for a new month."""
+        self.total_shifts = 0
+        self.day_shifts = 0
+        self.night_shifts = 0
+        self.shifts_24h = 0
+        self.weekend_shifts = 0
+        self.holiday_shifts = 0
+        self.weighted_total = 0
+        self.last_day_shift = None
+        self.last_night_shift = None
+        self.assigned_dates.clear()
+
+    is_available_on = Person.is_available_on
+    get_target_ratio = Person.get_target_ratio
+    get_stats_dict = Person.get_stats_dict
+
+    def __repr__(self) -> str:
+        return f"CompactPerson(name={self.name!r})"
+
+
+@dataclass
+class DayOccupancy:
+    """Tracks filled Day/Night slots and assigned staff for a single date."""
+    day_staff: List[str] = field(default_factory=list)
+    night_staff: List[str] = field(default_factory=list)
+
+    @property
+    def day_count(self) -> int:
+        return len(self.day_staff)
+
+    @property
+    def night_count(self) -> int:
+        return len(self.night_staff)
+
+    @property
+    def assigned_names(self) -> Set[str]:
+        return set(self.day_staff) | set(self.night_staff)
+
+
+@dataclass
+class ScheduleHistory:
+    """
+    Carry-over from previous months: the tail of the previous schedule, so gap
+    and weekend rules hold across the month boundary, and cumulative fairness
+    counters per person (normalized like FairnessState values).
+    """
+    tail: Dict[Tuple[str, date], ShiftType] = field(default_factory=dict)
+    totals: Dict[str, int] = field(default_factory=dict)
+    nights: Dict[str, int] = field(default_factory=dict)
+    weekends: Dict[str, int] = field(default_factory=dict)
+
+
+class _ValueHistogram:
+    """Multiset of integer values with O(1) updates, cached min/max and running sums."""
+
+    __slots__ = ("counts", "size", "min", "max", "total", "total_sq")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.size = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.total = 0
+        self.total_sq = 0
+
+    def add(self, value: int):
+        self.counts[value] = self.counts.get(value, 0) + 1
+        self.size += 1
+        self.total += value
+        self.total_sq += value * value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def remove(self, value: int):
+        count = self.counts[value] - 1
+        self.size -= 1
+        self.total -= value
+        self.total_sq -= value * value
+        if count:
+            self.counts[value] = count
+            return
+        del self.counts[value]
+        if not self.counts:
+            self.min = self.max = None
+            return
+        # Values move by at most a few units per update, so these walks are short
+        while self.min not in self.counts:
+            self.min += 1
+        while self.max not in self.counts:
+            self.max -= 1
+
+    def range(self) -> int:
+        """Return max - min, or 0 for an empty group."""
+        return self.max - self.min if self.size else 0
+
+    def variance(self) -> float:
+        """Return the sample variance, or 0 for fewer than two values."""
+        if self.size < 2:
+            return 0
+        return (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+
+
+class FairnessState:
+    """
+    Incremental fairness aggregates over the staff groups used for scoring.
+
+    Callers must discard(person) before changing a person's stats and add(person)
+    afterwards; min/max per group are then available in O(1).
+    Shift counts of half-month staff are doubled for comparison, and total, night
+    and weekend values include the counters carried over from previous months.
+    """
+
+    def __init__(
+        self,
+        staff: List[Person],
+        holiday_workers: Set[str],
+        total_days: int,
+        history: Optional[ScheduleHistory] = None,
+    ):
+        self.staff = list(staff)
+        self.holiday_workers = holiday_workers
+        self._multiplier = {
+            p.name: 2 if p.get_target_ratio(total_days) == 0.5 else 1 for p in self.staff
+        }
+        history = history or ScheduleHistory()
+        self.carry_totals = history.totals
+        self.carry_nights = history.nights
+        self.carry_weekends = history.weekends
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute all groups from the current Person stats."""
+        self.totals = _ValueHistogram()          # Normalized total shifts, all staff
+        self.nights = _ValueHistogram()          # Normalized night shifts, all staff
+        self.capable_days = _ValueHistogram()    # Normalized day shifts, night-capable staff
+        self.capable_nights = _ValueHistogram()  # Normalized night shifts, night-capable staff
+        self.weekends = _ValueHistogram()        # Weekend shifts, non-holiday workers
+        self.shifts_24h = _ValueHistogram()      # 24h shifts, 24h-capable staff
+        for person in self.staff:
+            self.add(person)
+
+    def normalize(self, person: Person, value: int) -> int:
+        """Normalize a shift count for the person's target ratio."""
+        return value * self._multiplier[person.name]
+
+    def total_value(self, person: Person) -> int:
+        """Normalized total shifts plus carried-over history."""
+        return self.normalize(person, person.total_shifts) + self.carry_totals.get(person.name, 0)
+
+    def night_value(self, person: Person) -> int:
+        """Normalized night shifts plus carried-over history."""
+        return self.normalize(person, person.night_shifts) + self.carry_nights.get(person.name, 0)
+
+    def weekend_value(self, person: Person) -> int:
+        """Weekend shifts plus carried-over history."""
+        return person.weekend_shifts + self.carry_weekends.get(person.name, 0)
+
+    def is_weekend_comparable(self, person: Person) -> bool:
+        """Weekend fairness only compares staff without holiday shifts."""
+        return person.name not in self.holiday_workers and person.holiday_shifts == 0
+
+    def _entries(self, person: Person):
+        multiplier = self._multiplier[person.name]
+        yield self.totals, self.total_value(person)
+        yield self.nights, self.night_value(person)
+        if person.can_do_night:
+            yield self.capable_days, person.day_shifts * multiplier
+            yield self.capable_nights, self.night_value(person)
+        if self.is_weekend_comparable(person):
+            yield self.weekends, self.weekend_value(person)
+        if person.can_do_24h:
+            yield self.shifts_24h, person.shifts_24h
+
+    def add(self, person: Person):
+        for histogram, value in self._entries(person):
+            histogram.add(value)
+
+    def discard(self, person: Person):
+        for histogram, value in self._entries(person):
+            histogram.remove(value)
+
+
+@dataclass(frozen=True, eq=False)
+class ScheduleSnapshot:
+    """
+    Immutable, picklable capture of a Scheduler's assignments.
+    Person stats are derived from the matrix on restore; only the last Day/Night
+    shift dates (which depend on assignment order) are stored separately.
+    """
+    staff_names: Tuple[str, ...]
+    matrix: np.ndarray       # Read-only copy of Scheduler.schedule_matrix
+    last_day: np.ndarray     # Date ordinal of last_day_shift per person (0 = None)
+    last_night: np.ndarray   # Date ordinal of last_night_shift per person (0 = None)
+
+
+@dataclass
+class FeasibilityIssue:
+    """One capacity shortfall that makes a configuration impossible to schedule."""
+    kind: str  # "date_supply", "night_window", "day_window" or "weekend_supply"
+    dates: List[date]
+    shift_type: Optional[ShiftType]  # None when Day and Night demand are counted together
+    required: int
+    available: int
+    message: str
+
+
+@dataclass
+class FeasibilityReport:
+    """Result of Scheduler.check_feasibility()."""
+    issues: List[FeasibilityIssue] = field(default_factory=list)
+
+    @property
+    def feasible(self) -> bool:
+        return not self.issues
+
+
+@dataclass(frozen=True)
+class ScheduleProgress:
+    """
+    Report passed to the generate_schedule() progress callback.
+
+    phase is where the last attempt stopped: "init" (no weekend-eligible staff),
+    "weekends", "thursdays", "weekdays" (a slot could not be covered),
+    "validation", "bound" (pruned by the fairness lower bound, after the
+    weekends or while filling weekdays) or "done" (valid schedule).
+    With workers > 1, progress arrives once per finished chunk of attempts with
+    phase "batch". Engine stages report "exact", "beam", "anneal" or "lns" when
+    they start.
+    """
+    attempt: int                   # Attempts finished so far
+    num_attempts: int
+    phase: str
+    best_score: Optional[float]    # Best fairness score so far, None if no valid schedule yet
+
+
+# Progress callback: return True to cancel; the best schedule so far is kept
+ProgressCallback = Callable[[ScheduleProgress], Optional[bool]]
+
+
+@dataclass(frozen=True, eq=False)
+class _BeamNode:
+    """
+    One date's assignments in a beam-search partial schedule.
+    Partial schedules are linked through parent, so siblings share their history.
+    """
+    parent: Optional["_BeamNode"]
+    assignments: Tuple[Tuple[str, date, ShiftType], ...]
+    depth: int
+
+
+# Cost of a slot/person pair that violates a hard constraint
+FORBIDDEN_COST = 1e9
+
+
+def _min_cost_assignment(cost: List[List[float]]) -> List[int]:
+    """
+    Hungarian algorithm for a rectangular cost matrix with rows <= columns.
+    Returns the column assigned to each row, minimizing the total cost.
+    """
+    n, m = len(cost), len(cost[0])
+    inf = float('inf')
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    match = [0] * (m + 1)  # Row (1-based) matched to each column, 0 = free
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        min_slack = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            row = cost[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    slack = row[j - 1] - u[i0] - v[j]
+                    if slack < min_slack[j]:
+                        min_slack[j] = slack
+                        way[j] = j0
+                    if min_slack[j] < delta:
+                        delta = min_slack[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_slack[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # Augment along the alternating path
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    columns = [0] * n
+    for j in range(1, m + 1):
+        if match[j]:
+            columns[match[j] - 1] = j - 1
+    return columns
+
+
 class Scheduler:
     """
     Main scheduler class implementing the hospital shift scheduling algorithm.
@@ -118,20 +553,51 @@ class Scheduler:
         holidays: Set[date] = None,
         day_shifts_per_day: int = 1,
         night_shifts_per_day: int = 1,
+        history: Optional[ScheduleHistory] = None,
     ):
         self.year = year
         self.month = month
         self.staff = {p.name: p for p in staff}
+        self.staff_names = list(self.staff)
+        self.staff_index = {name: i for i, name in enumerate(self.staff_names)}
         self.holidays = holidays or set()
         self.day_shifts_per_day = day_shifts_per_day
         self.night_shifts_per_day = night_shifts_per_day
+        self.history = history or ScheduleHistory()
 
         # Generate dates for the month
         self._generate_month_dates()
 
+        # Random source for tie-breaking; replaced with a per-attempt instance
+        # by generate_schedule so each attempt is reproducible from its seed
+        self.rng = random.Random()
+        self.seed: Optional[int] = None
+
+        # Outcome of the last engine="exact" run (exact_solver.SolverResult)
+        self.exact_result = None
+
+        # Capacity analysis, computed once by the first check_feasibility() call
+        # (generate_schedule() runs it too); it only depends on the configuration
+        self.feasibility_report: Optional[FeasibilityReport] = None
+
+        # True if the last generate_schedule() call was cancelled by its progress callback
+        self.cancelled = False
+
         # Schedule storage: (person_name, date) -> ShiftType
         self.schedule: Dict[Tuple[str, date], ShiftType] = {}
 
+        # Per-person sorted day ordinals of night-type (NIGHT/24H) and day-type
+        # (DAY/24H) shifts, so gap rules can be answered with bisect
+        self._night_index: Dict[str, List[int]] = {name: [] for name in self.staff}
+        self._day_index: Dict[str, List[int]] = {name: [] for name in self.staff}
+
+        # Per-date slot occupancy, kept in sync with self.schedule
+        self.occupancy: Dict[date, DayOccupancy] = {d: DayOccupancy() for d in self.dates}
+
+        # Array-backed schedule: rows follow staff_names, columns follow dates,
+        # cells hold SHIFT_CODES (NO_SHIFT when unassigned)
+        self.schedule_matrix = np.zeros((len(self.staff_names), len(self.dates)), dtype=np.int8)
+
         # Pre-calculate holiday workers (people with fixed_on dates that are holidays)
         # This is a HARD constraint that must be known BEFORE scheduling starts
         self.holiday_workers: Set[str] = set()
@@ -141,16 +607,22 @@ class Scheduler:
                     self.holiday_workers.add(person.name)
                     break
 
+        # Incremental min/max of normalized counts per staff group
+        self.fairness = FairnessState(
+            list(self.staff.values()), self.holiday_workers, len(self.dates), self.history
+        )
+        self._seed_history()
+
         # Calculate targets
         self._calculate_targets()
 
     def _generate_month_dates(self):
-        """Generate all dates in the scheduling month."""
-        import calendar
-        num_days = calendar.monthrange(self.year, self.month)[1]
-        self.dates = [date(self.year, self.month, d) for d in range(1, num_days + 1)]
-        self.weekends = {d for d in self.dates if d.weekday() in (5, 6)}
-        self.thursdays = [d for d in self.dates if d.weekday() == 3]
+        """Look up the dates of the scheduling month in the shared calendar table."""
+        self.calendar = get_calendar_table(self.year, self.month, self.holidays)
+        self.dates = list(self.calendar.dates)
+        self.date_index = self.calendar.date_index
+        self.weekends = self.calendar.weekend_dates
+        self.thursdays = list(self.calendar.thursday_dates)
 
     def _calculate_targets(self):
         """Calculate target shifts per person based on staff count and fixed off days."""
@@ -182,6 +654,10 @@ class Scheduler:
             # Round 0.5 to 1 (四舍五入)
             person.target_shifts = round(raw_target)
 
+    # is_holiday/is_weekend take dates from callers that have no day index;
+    # a set lookup is cheaper than date_index plus an array read. Loops over the
+    # month use the calendar table's arrays and index tuples instead.
+
     def is_holiday(self, d: date) -> bool:
         """Check if date is a holiday."""
         return d in self.holidays
@@ -204,6 +680,10 @@ class Scheduler:
 
     def _get_weekend_pair(self, d: date) -> Optional[date]:
         """Get the other day of the same weekend (Sat->Sun or Sun->Sat)."""
+        i = self.date_index.get(d)
+        if i is not None:
+            return self.calendar.weekend_pair_dates[i]
+        # Dates outside the month
         if d.weekday() == 5:  # Saturday
             return d + timedelta(days=1)  # Sunday
         elif d.weekday() == 6:  # Sunday
@@ -212,6 +692,10 @@ class Scheduler:
 
     def _get_thursday_for_weekend(self, d: date) -> Optional[date]:
         """Get the Thursday before a weekend date."""
+        i = self.date_index.get(d)
+        if i is not None:
+            return self.calendar.comp_thursday_dates[i]
+        # Dates outside the month
         if d.weekday() == 5:  # Saturday
             return d - timedelta(days=2)  # Thursday
         elif d.weekday() == 6:  # Sunday
@@ -222,11 +706,125 @@ class Scheduler:
         """Check if person has Thursday night shift for the weekend's week."""
         thursday = self._get_thursday_for_weekend(weekend_date)
         if thursday and thursday in person.assigned_dates:
-            shift = self.schedule.get((person.name, thursday))
+            key = (person.name, thursday)
+            shift = self.schedule.get(key) or self.history.tail.get(key)
             if shift in (ShiftType.NIGHT, ShiftType.FULL_24H):
                 return True
         return False
 
+    # ==================== SHIFT INDEX ====================
+
+    def _reset_assignments(self):
+        """Clear the schedule, the per-person shift indexes and date occupancy."""
+        self.schedule = {}
+        self._night_index = {name: [] for name in self.staff}
+        self._day_index = {name: [] for name in self.staff}
+        self.occupancy = {d: DayOccupancy() for d in self.dates}
+        self.schedule_matrix = np.zeros((len(self.staff_names), len(self.dates)), dtype=np.int8)
+        self._seed_history()
+        self.fairness.rebuild()
+
+    def _seed_history(self):
+        """
+        Add the previous month's tail to the gap indexes, assigned dates and last
+        shift dates, so gap, weekend and Thursday rules hold across the boundary.
+        Tail shifts are not counted in the monthly stats.
+        """
+        first_day = self.dates[0]
+        for (name, d), shift_type in self.history.tail.items():
+            person = self.staff.get(name)
+            if person is None or d >= first_day:
+                continue
+            person.assigned_dates.add(d)
+            if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
+                insort(self._night_index[name], d.toordinal())
+                if person.last_night_shift is None or d > person.last_night_shift:
+                    person.last_night_shift = d
+            if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
+                insort(self._day_index[name], d.toordinal())
+                if person.last_day_shift is None or d > person.last_day_shift:
+                    person.last_day_shift = d
+
+    def _index_shift(self, name: str, d: date, shift_type: ShiftType):
+        """Add a shift to the per-person sorted indexes and the date occupancy."""
+        ordinal = d.toordinal()
+        occupancy = self.occupancy.setdefault(d, DayOccupancy())
+        self.schedule_matrix[self.staff_index[name], self.date_index[d]] = SHIFT_CODES[shift_type]
+        if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
+            insort(self._night_index[name], ordinal)
+            occupancy.night_staff.append(name)
+        if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
+            insort(self._day_index[name], ordinal)
+            occupancy.day_staff.append(name)
+
+    def _unindex_shift(self, name: str, d: date, shift_type: ShiftType):
+        """Remove a shift from the per-person sorted indexes and the date occupancy."""
+        ordinal = d.toordinal()
+        occupancy = self.occupancy[d]
+        self.schedule_matrix[self.staff_index[name], self.date_index[d]] = NO_SHIFT
+        if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
+            ordinals = self._night_index[name]
+            del ordinals[bisect_left(ordinals, ordinal)]
+            occupancy.night_staff.remove(name)
+        if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
+            ordinals = self._day_index[name]
+            del ordinals[bisect_left(ordinals, ordinal)]
+            occupancy.day_staff.remove(name)
+
+    def _rebuild_indexes(self):
+        """
+        Rebuild the per-person shift indexes and date occupancy from self.schedule,
+        and the fairness aggregates from the current Person stats.
+        """
+        self._night_index = {name: [] for name in self.staff}
+        self._day_index = {name: [] for name in self.staff}
+        self.occupancy = {d: DayOccupancy() for d in self.dates}
+        self.schedule_matrix = np.zeros((len(self.staff_names), len(self.dates)), dtype=np.int8)
+        self._seed_history()
+        self.fairness.rebuild()
+        for (name, d), shift_type in self.schedule.items():
+            self._index_shift(name, d, shift_type)
+
+    @staticmethod
+    def _gap_violation(
+        ordinals: List[int], d: date, min_gap: int, before: bool = True, after: bool = True
+    ) -> Optional[int]:
+        """
+        Find an indexed shift closer than min_gap days to d.
+        before/after select which side of d is checked; same-day entries are ignored.
+        Returns the gap in days, or None if the gap rule is satisfied.
+        """
+        ordinal = d.toordinal()
+        if before:
+            i = bisect_left(ordinals, ordinal - min_gap + 1)
+            if i < len(ordinals) and ordinals[i] < ordinal:
+                return ordinal - ordinals[i]
+        if after:
+            i = bisect_left(ordinals, ordinal + 1)
+            if i < len(ordinals) and ordinals[i] < ordinal + min_gap:
+                return ordinals[i] - ordinal
+        return None
+
+    def _check_night_gap_with_all_shifts(self, person: Person, d: date, min_gap: int) -> bool:
+        """Check that a night shift on d is at least min_gap days from all other night shifts."""
+        return self._gap_violation(self._night_index[person.name], d, min_gap) is None
+
+    def _check_day_gap_with_all_shifts(self, person: Person, d: date, min_gap: int) -> bool:
+        """Check that a day shift on d is at least min_gap days from all other day shifts."""
+        return self._gap_violation(self._day_index[person.name], d, min_gap) is None
+
+    def _check_night_to_day_gap(self, person: Person, d: date, min_gap: int) -> bool:
+        """Check that a day shift on d does not follow a night shift within min_gap days."""
+        return self._gap_violation(
+            self._night_index[person.name], d, min_gap, after=False
+        ) is None
+
+    def _check_reverse_night_to_day_gap(self, person: Person, d: date, min_gap: int) -> bool:
+        """Check that a night shift on d is not followed by a day shift within min_gap days."""
+        return self._gap_violation(
+            self._day_index[person.name], d, min_gap, before=False
+        ) is None
+
     def _basic_can_assign(self, person: Person, d: date, shift_type: ShiftType) -> bool:
         """
         Basic assignment check without fairness constraints.
@@ -253,33 +851,21 @@ class Scheduler:
         # Check gap rules - Night shifts (NIGHT or 24H)
         # Check against ALL existing night shifts to handle non-chronological assignment
         if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                    gap = abs((d - assigned_date).days)
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_NIGHT_GAP:
-                        return False
+            if not self._check_night_gap_with_all_shifts(person, d, self.MIN_NIGHT_TO_NIGHT_GAP):
+                return False
             # Also check: if assigning a night shift, are there day shifts within
             # the next MIN_NIGHT_TO_DAY_GAP days that would be violated?
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.DAY, ShiftType.FULL_24H):
-                    gap = (assigned_date - d).days  # day_date - night_date
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_DAY_GAP:
-                        return False  # Day shift too soon after this night shift
+            if not self._check_reverse_night_to_day_gap(person, d, self.MIN_NIGHT_TO_DAY_GAP):
+                return False  # Day shift too soon after this night shift
 
         # Check gap rules - Day shifts (DAY or 24H)
         if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
             # Night-to-Day gap: no day shift within MIN_NIGHT_TO_DAY_GAP days after night
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                    gap = (d - assigned_date).days
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_DAY_GAP:
-                        return False
+            if not self._check_night_to_day_gap(person, d, self.MIN_NIGHT_TO_DAY_GAP):
+                return False
             # Day-to-Day gap: check against ALL existing day shifts
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.DAY, ShiftType.FULL_24H):
-                    gap = abs((d - assigned_date).days)
-                    if gap > 0 and gap < self.MIN_DAY_TO_DAY_GAP:
-                        return False
+            if not self._check_day_gap_with_all_shifts(person, d, self.MIN_DAY_TO_DAY_GAP):
+                return False
 
         # Weekend constraint: max 1 shift per weekend per person
         if self.is_weekend(d):
@@ -325,33 +911,29 @@ class Scheduler:
         # Check gap rules - Night shifts (NIGHT or 24H)
         # Check against ALL existing night shifts to handle non-chronological assignment
         if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                    gap = abs((d - assigned_date).days)
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_NIGHT_GAP:
-                        return False, f"Night gap too short ({gap} days)"
+            nights = self._night_index[person.name]
+            days = self._day_index[person.name]
+            gap = self._gap_violation(nights, d, self.MIN_NIGHT_TO_NIGHT_GAP)
+            if gap is not None:
+                return False, f"Night gap too short ({gap} days)"
             # Also check: if assigning a night shift, are there day shifts within
             # the next MIN_NIGHT_TO_DAY_GAP days that would be violated?
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.DAY, ShiftType.FULL_24H):
-                    gap = (assigned_date - d).days  # day_date - night_date
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_DAY_GAP:
-                        return False, f"Existing day shift too close ({gap} days after)"
+            gap = self._gap_violation(days, d, self.MIN_NIGHT_TO_DAY_GAP, before=False)
+            if gap is not None:
+                return False, f"Existing day shift too close ({gap} days after)"
 
         # Check gap rules - Day shifts (DAY or 24H)
         if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
+            nights = self._night_index[person.name]
+            days = self._day_index[person.name]
             # Night-to-Day gap: no day shift within MIN_NIGHT_TO_DAY_GAP days after night
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                    gap = (d - assigned_date).days
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_DAY_GAP:
-                        return False, f"Night-to-Day gap too short ({gap} days)"
+            gap = self._gap_violation(nights, d, self.MIN_NIGHT_TO_DAY_GAP, after=False)
+            if gap is not None:
+                return False, f"Night-to-Day gap too short ({gap} days)"
             # Day-to-Day gap: check against ALL existing day shifts
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.DAY, ShiftType.FULL_24H):
-                    gap = abs((d - assigned_date).days)
-                    if gap > 0 and gap < self.MIN_DAY_TO_DAY_GAP:
-                        return False, f"Day gap too short ({gap} days)"
+            gap = self._gap_violation(days, d, self.MIN_DAY_TO_DAY_GAP)
+            if gap is not None:
+                return False, f"Day gap too short ({gap} days)"
 
         # Weekend constraint: max 1 shift per weekend per person
         if self.is_weekend(d):
@@ -366,26 +948,21 @@ class Scheduler:
         # HARD CONSTRAINT: Night shift fairness - max difference of 1
         # Only apply to those who can do night shifts
         if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
-            night_capable = [p for p in self.staff.values() if p.can_do_night]
-            if night_capable:
-                total_days = len(self.dates)
-
+            fairness = self.fairness
+            if fairness.capable_nights.size:
                 # Normalize for target ratio comparison
-                def get_norm_night(p):
-                    ratio = p.get_target_ratio(total_days)
-                    return p.night_shifts * 2 if ratio == 0.5 else p.night_shifts
-
-                person_norm = get_norm_night(person)
-                min_norm = min(get_norm_night(p) for p in night_capable)
+                person_norm = fairness.night_value(person)
+                min_norm = fairness.capable_nights.min
 
                 # Block if this person has more normalized night shifts
                 if person_norm > min_norm:
-                    others_with_fewer = [
-                        p for p in night_capable
-                        if p.name != person.name
-                        and get_norm_night(p) <= min_norm
+                    others_with_fewer = any(
+                        p.can_do_night
+                        and p.name != person.name
+                        and fairness.night_value(p) <= min_norm
                         and self._basic_can_assign(p, d, shift_type)
-                    ]
+                        for p in self.staff.values()
+                    )
                     if others_with_fewer:
                         return False, "Night fairness: others have fewer night shifts"
 
@@ -399,30 +976,32 @@ class Scheduler:
         # Only compare among non-holiday workers (holiday workers are excluded from weekends)
         if self.is_weekend(d):
             # Weekend fairness only among non-holiday workers
-            comparable_staff = [p for p in self.staff.values()
-                               if not self.is_holiday_worker(p) and p.holiday_shifts == 0]
-            if comparable_staff and not self.is_holiday_worker(person) and person.holiday_shifts == 0:
-                min_weekend = min(p.weekend_shifts for p in comparable_staff)
+            fairness = self.fairness
+            if fairness.weekends.size and fairness.is_weekend_comparable(person):
+                min_weekend = fairness.weekends.min
 
                 # Block if this person already has more weekend shifts than minimum
-                if person.weekend_shifts > min_weekend:
-                    others_with_fewer = [
-                        p for p in comparable_staff
-                        if p.name != person.name
-                        and p.weekend_shifts <= min_weekend
+                person_weekends = fairness.weekend_value(person)
+                if person_weekends > min_weekend:
+                    others_with_fewer = any(
+                        p.name != person.name
+                        and fairness.is_weekend_comparable(p)
+                        and fairness.weekend_value(p) <= min_weekend
                         and self._basic_can_assign(p, d, shift_type)
-                    ]
+                        for p in self.staff.values()
+                    )
                     if others_with_fewer:
                         return False, "Weekend fairness: others have fewer weekend shifts"
 
                 # Block if assigning would create difference > 1
-                if person.weekend_shifts >= min_weekend + 1:
-                    others_available = [
-                        p for p in comparable_staff
-                        if p.name != person.name
-                        and p.weekend_shifts < person.weekend_shifts
+                if person_weekends >= min_weekend + 1:
+                    others_available = any(
+                        p.name != person.name
+                        and fairness.is_weekend_comparable(p)
+                        and fairness.weekend_value(p) < person_weekends
                         and self._basic_can_assign(p, d, shift_type)
-                    ]
+                        for p in self.staff.values()
+                    )
                     if others_available:
                         return False, "Weekend fairness: would exceed max diff of 1"
 
@@ -453,46 +1032,19 @@ class Scheduler:
         Prioritizes fairness to keep differences within 1 shift.
         """
         score = 0.0
-        total_days = len(self.dates)
+        fairness = self.fairness
 
-        # Get person's target ratio (0.5 for half-month, 1.0 for others)
-        person_ratio = person.get_target_ratio(total_days)
+        # Normalized shifts (adjusted for target ratio) and group min/max come from
+        # the incremental fairness state. This ensures Jones with 50% target is
+        # compared fairly.
+        min_total_norm = fairness.totals.min
+        max_total_norm = fairness.totals.max
+        min_night_norm = fairness.nights.min
+        max_night_norm = fairness.nights.max
 
-        # Calculate normalized shifts (adjusted for target ratio)
-        # This ensures Jones with 50% target is compared fairly
-        def get_normalized_shifts(p: Person) -> float:
-            ratio = p.get_target_ratio(total_days)
-            if ratio == 0.5:
-                return p.total_shifts * 2  # Double for comparison
-            return p.total_shifts
-
-        def get_normalized_day(p: Person) -> float:
-            ratio = p.get_target_ratio(total_days)
-            if ratio == 0.5:
-                return p.day_shifts * 2
-            return p.day_shifts
-
-        def get_normalized_night(p: Person) -> float:
-            ratio = p.get_target_ratio(total_days)
-            if ratio == 0.5:
-                return p.night_shifts * 2
-            return p.night_shifts
-
-        # Calculate normalized min/max for fairness
-        normalized_totals = [get_normalized_shifts(p) for p in self.staff.values()]
-        normalized_days = [get_normalized_day(p) for p in self.staff.values()]
-        normalized_nights = [get_normalized_night(p) for p in self.staff.values()]
-
-        min_total_norm = min(normalized_totals)
-        max_total_norm = max(normalized_totals)
-        min_day_norm = min(normalized_days)
-        max_day_norm = max(normalized_days)
-        min_night_norm = min(normalized_nights)
-        max_night_norm = max(normalized_nights)
-
-        person_total_norm = get_normalized_shifts(person)
-        person_day_norm = get_normalized_day(person)
-        person_night_norm = get_normalized_night(person)
+        person_total_norm = fairness.total_value(person)
+        person_day_norm = fairness.normalize(person, person.day_shifts)
+        person_night_norm = fairness.night_value(person)
 
         # STRONG fairness: prioritize people with fewer normalized shifts
         # Total shifts fairness
@@ -510,11 +1062,9 @@ class Scheduler:
                 score += 80  # Strong preference for non-night workers
             else:
                 # For night-capable staff, apply day fairness among themselves
-                night_capable = [p for p in self.staff.values() if p.can_do_night]
-                if night_capable:
-                    night_cap_days = [get_normalized_day(p) for p in night_capable]
-                    min_day_nc = min(night_cap_days)
-                    max_day_nc = max(night_cap_days)
+                if fairness.capable_days.size:
+                    min_day_nc = fairness.capable_days.min
+                    max_day_nc = fairness.capable_days.max
                     if person_day_norm <= min_day_nc:
                         score += 30
                     elif person_day_norm >= max_day_nc and max_day_nc - min_day_nc >= 1:
@@ -551,25 +1101,23 @@ class Scheduler:
                     score -= 1000  # Extremely strong penalty - almost a hard block
 
             # Weekend fairness only among non-holiday workers
-            comparable_staff = [p for p in self.staff.values()
-                               if not self.is_holiday_worker(p) and p.holiday_shifts == 0]
-            if comparable_staff and not self.is_holiday_worker(person) and person.holiday_shifts == 0:
-                min_weekend = min(p.weekend_shifts for p in comparable_staff)
-                max_weekend = max(p.weekend_shifts for p in comparable_staff)
+            if fairness.weekends.size and fairness.is_weekend_comparable(person):
+                min_weekend = fairness.weekends.min
 
                 # Weekend fairness (secondary to holiday constraint)
-                if person.weekend_shifts <= min_weekend:
+                person_weekends = fairness.weekend_value(person)
+                if person_weekends <= min_weekend:
                     score += 100
-                elif person.weekend_shifts > min_weekend:
+                elif person_weekends > min_weekend:
                     score -= 100
 
                 # Extra penalty if assigning would create difference > 1
-                if person.weekend_shifts >= min_weekend + 1:
+                if person_weekends >= min_weekend + 1:
                     score -= 200
 
         # 24h shift fairness - 尽量每人最多一次24小时班
         if shift_type == ShiftType.FULL_24H:
-            min_24h = min(p.shifts_24h for p in self.staff.values() if p.can_do_24h)
+            min_24h = fairness.shifts_24h.min
 
             # Strong penalty if person already has 24h shifts and others don't
             if person.shifts_24h > min_24h:
@@ -605,7 +1153,7 @@ class Scheduler:
                     score -= 500  # Very strong penalty - Thursday night = weekend off
 
         # Randomization factor to break ties
-        score += random.uniform(0, 0.5)
+        score += self.rng.uniform(0, 0.5)
 
         return score
 
@@ -623,7 +1171,9 @@ class Scheduler:
                 return False
 
         self.schedule[(person.name, d)] = shift_type
+        self._index_shift(person.name, d, shift_type)
         person.assigned_dates.add(d)
+        self.fairness.discard(person)
 
         weight = SHIFT_WEIGHTS[shift_type]
         person.weighted_total += weight
@@ -647,8 +1197,49 @@ class Scheduler:
         if self.is_holiday(d):
             person.holiday_shifts += 1
 
+        self.fairness.add(person)
         return True
 
+    def _unassign_shift(self, person: Person, d: date) -> ShiftType:
+        """
+        Remove a person's shift on a date and roll back their stats.
+        Returns the shift type that was removed.
+        """
+        shift_type = self.schedule.pop((person.name, d))
+        self._unindex_shift(person.name, d, shift_type)
+        person.assigned_dates.discard(d)
+
+        # The removed shift may have been the latest one; fall back to the
+        # latest remaining shift (including carried history)
+        if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
+            nights = self._night_index[person.name]
+            person.last_night_shift = date.fromordinal(nights[-1]) if nights else None
+        if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
+            days = self._day_index[person.name]
+            person.last_day_shift = date.fromordinal(days[-1]) if days else None
+        self.fairness.discard(person)
+
+        weight = SHIFT_WEIGHTS[shift_type]
+        person.weighted_total -= weight
+        person.total_shifts -= 1
+
+        if shift_type == ShiftType.DAY:
+            person.day_shifts -= 1
+        elif shift_type == ShiftType.NIGHT:
+            person.night_shifts -= 1
+        elif shift_type == ShiftType.FULL_24H:
+            person.shifts_24h -= 1
+            person.day_shifts -= 1
+            person.night_shifts -= 1
+
+        if self.is_weekend(d):
+            person.weekend_shifts -= 1
+        if self.is_holiday(d):
+            person.holiday_shifts -= 1
+
+        self.fairness.add(person)
+        return shift_type
+
     def _emergency_can_assign(self, person: Person, d: date, shift_type: ShiftType) -> bool:
         """
         Emergency assignment check - uses relaxed gap rules (3 days for night-to-night).
@@ -681,33 +1272,21 @@ class Scheduler:
         # Use emergency gap (3 days) for night-to-night instead of normal (5 days)
         if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
             # Check gap with ALL night shifts
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                    gap = abs((d - assigned_date).days)
-                    if gap > 0 and gap < self.EMERGENCY_NIGHT_TO_NIGHT_GAP:
-                        return False
+            if not self._check_night_gap_with_all_shifts(person, d, self.EMERGENCY_NIGHT_TO_NIGHT_GAP):
+                return False
             # Also check: if assigning a night shift, are there day shifts within
             # the next MIN_NIGHT_TO_DAY_GAP days that would be violated?
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.DAY, ShiftType.FULL_24H):
-                    gap = (assigned_date - d).days  # day_date - night_date
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_DAY_GAP:
-                        return False  # Day shift too soon after this night shift
+            if not self._check_reverse_night_to_day_gap(person, d, self.MIN_NIGHT_TO_DAY_GAP):
+                return False  # Day shift too soon after this night shift
 
         # Day shifts (DAY or 24H) also need gap checks
         if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
             # Night-to-Day gap is a hard constraint (no day shift within 3 days after night)
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                    gap = (d - assigned_date).days
-                    if gap > 0 and gap < self.MIN_NIGHT_TO_DAY_GAP:
-                        return False
+            if not self._check_night_to_day_gap(person, d, self.MIN_NIGHT_TO_DAY_GAP):
+                return False
             # Day-to-Day gap is also enforced
-            for (name, assigned_date), stype in self.schedule.items():
-                if name == person.name and stype in (ShiftType.DAY, ShiftType.FULL_24H):
-                    gap = abs((d - assigned_date).days)
-                    if gap > 0 and gap < self.MIN_DAY_TO_DAY_GAP:
-                        return False
+            if not self._check_day_gap_with_all_shifts(person, d, self.MIN_DAY_TO_DAY_GAP):
+                return False
 
         # Weekend constraints (these are hard constraints, not relaxable)
         if self.is_weekend(d):
@@ -764,7 +1343,72 @@ class Scheduler:
                 if d in self.dates:
                     self._assign_shift(person, d, shift_type)
 
-    def generate_schedule(self, num_attempts: int = 100) -> bool:
+    # ==================== CROSS-MONTH HISTORY ====================
+
+    def export_history(self, tail_days: int = 7) -> ScheduleHistory:
+        """
+        History to pass to the next month's Scheduler: the assignments of the last
+        tail_days days (enough to cover the longest gap rule and the Thursday
+        rule) and the cumulative fairness counters including this month.
+        """
+        cutoff = self.dates[-1] - timedelta(days=tail_days - 1)
+        fairness = self.fairness
+        return ScheduleHistory(
+            tail={key: shift for key, shift in self.schedule.items() if key[1] >= cutoff},
+            totals={p.name: fairness.total_value(p) for p in self.staff.values()},
+            nights={p.name: fairness.night_value(p) for p in self.staff.values()},
+            weekends={p.name: fairness.weekend_value(p) for p in self.staff.values()},
+        )
+
+    # ==================== SNAPSHOTS ====================
+
+    def snapshot(self) -> ScheduleSnapshot:
+        """Capture the current assignments as an immutable snapshot."""
+        matrix = self.schedule_matrix.copy()
+        last_day = np.array(
+            [p.last_day_shift.toordinal() if p.last_day_shift else 0 for p in self.staff.values()],
+            dtype=np.int32,
+        )
+        last_night = np.array(
+            [p.last_night_shift.toordinal() if p.last_night_shift else 0 for p in self.staff.values()],
+            dtype=np.int32,
+        )
+        for array in (matrix, last_day, last_night):
+            array.setflags(write=False)
+        return ScheduleSnapshot(tuple(self.staff_names), matrix, last_day, last_night)
+
+    def restore(self, snapshot: ScheduleSnapshot):
+        """Replace the current assignments and stats with those of a snapshot."""
+        if snapshot.staff_names != tuple(self.staff_names):
+            raise ValueError("Snapshot was taken from a different staff list")
+
+        for person in self.staff.values():
+            person.reset_monthly_stats()
+        self._reset_assignments()
+
+        # Replay date by date so occupancy lists follow roster order
+        for day_idx, staff_idx in np.argwhere(snapshot.matrix.T != NO_SHIFT):
+            person = self.staff[self.staff_names[staff_idx]]
+            shift_type = CODE_SHIFTS[int(snapshot.matrix[staff_idx, day_idx])]
+            self._assign_shift(person, self.dates[day_idx], shift_type)
+
+        for i, person in enumerate(self.staff.values()):
+            day_ordinal = int(snapshot.last_day[i])
+            night_ordinal = int(snapshot.last_night[i])
+            person.last_day_shift = date.fromordinal(day_ordinal) if day_ordinal else None
+            person.last_night_shift = date.fromordinal(night_ordinal) if night_ordinal else None
+
+    def generate_schedule(
+        self,
+        num_attempts: int = 100,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        local_search: bool = False,
+        engine: str = "greedy",
+        time_budget_ms: int = 2000,
+        beam_width: int = 8,
+        progress: Optional[ProgressCallback] = None,
+    ) -> bool:
         """
         Generate the monthly schedule using Multi-Stage Assignment approach.
 
@@ -775,96 +1419,312 @@ class Scheduler:
         Phase 3: Fill remaining weekday slots
         Phase 4: Validate and retry if needed (no swapping loops)
 
+        Args:
+            num_attempts: Number of randomized attempts; the fairest result is kept
+            workers: Number of worker processes. Values > 1 split the attempts into
+                batches run on a process pool.
+            seed: Base seed. Attempt N always uses the same random stream for a given
+                seed, regardless of worker count. If None, a seed is drawn from the
+                global random module; the seed used is stored in self.seed.
+            local_search: Run improve_schedule() on the best attempt
+            engine: "greedy" keeps the best attempt as is; "anneal" then runs
+                anneal_schedule() on it; "exact" fills the open slots with the
+                backtracking solver (see exact_solver.py) and only falls back to
+                the randomized attempts if its node limit is reached; "lns" runs
+                lns_schedule() on the best attempt; "beam" builds the schedule
+                with beam_schedule() and only falls back to the randomized
+                attempts if the beam dies out
+            time_budget_ms: Wall-clock budget of the annealing or LNS phase
+            beam_width: Number of partial schedules kept by the beam engine
+            progress: Called with a ScheduleProgress after every attempt (after
+                every chunk of attempts with workers > 1) and when an engine
+                stage starts.
+                Returning True cancels generation: remaining attempts and stages
+                are skipped, the best schedule so far is kept and self.cancelled
+                is set.
+
         Returns True if successful, False if coverage requirements cannot be met.
         """
-        best_schedule = None
-        best_stats = None
-        best_fairness_score = float('inf')
+        if engine not in ("greedy", "anneal", "exact", "lns", "beam"):
+            raise ValueError(f"Unknown engine: {engine}")
+
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.cancelled = False
+
+        def report(attempt: int, phase: str, best_score: Optional[float]) -> bool:
+            if progress is not None and progress(
+                ScheduleProgress(attempt, num_attempts, phase, best_score)
+            ):
+                self.cancelled = True
+            return self.cancelled
+
+        # Reject impossible configurations before running any attempt
+        if not self.check_feasibility().feasible:
+            return False
 
-        # Track fairness relaxation level (start strict, relax if needed)
-        max_weekend_diff = 1  # Start with strict fairness
+        if engine == "exact":
+            if report(0, "exact", None):
+                return False
+            result = self._run_exact(seed)
+            if result.status == "infeasible":
+                return False
+            if result.status == "feasible":
+                self.rng = self._attempt_rng(seed, num_attempts)
+                if local_search:
+                    self.improve_schedule()
+                return True
 
-        for attempt in range(num_attempts):
-            # Reset all stats
-            for person in self.staff.values():
-                person.reset_monthly_stats()
+        if engine == "beam":
+            if report(0, "beam", None):
+                return False
+            self.rng = self._attempt_rng(seed, 0)
+            if self.beam_schedule(beam_width) is not None:
+                self.rng = self._attempt_rng(seed, num_attempts)
+                if local_search:
+                    self.improve_schedule()
+                return True
 
-            self.schedule = {}
+        if workers > 1 and num_attempts > 1:
+            best_fairness_score, best_snapshot = self._run_attempts_parallel(
+                num_attempts, workers, seed, report
+            )
+        else:
+            best_fairness_score, best_snapshot = self._run_attempts(
+                range(num_attempts), seed, report
+            )
 
-            # Seed randomization for variety between attempts
-            random.seed(attempt * 42 + random.randint(0, 1000))
+        # Restore the best schedule
+        if best_snapshot is not None:
+            self.restore(best_snapshot)
+            if self.cancelled:
+                return True
+            self.rng = self._attempt_rng(seed, num_attempts)
+            if engine in ("anneal", "lns") and not report(num_attempts, engine, best_fairness_score):
+                if engine == "anneal":
+                    self.anneal_schedule(time_budget_ms)
+                else:
+                    self.lns_schedule(time_budget_ms)
+            if local_search and not self.cancelled:
+                self.improve_schedule()
+            return True
 
-            # ========== PHASE 0: INITIALIZATION ==========
-            # Process fixed assignments first (holidays, etc.)
-            self._process_fixed_assignments()
+        return False
 
-            # Identify weekend-eligible staff (exclude holiday workers)
-            weekend_eligible = [
-                p for p in self.staff.values()
-                if not self.is_holiday_worker(p) and p.holiday_shifts == 0
-            ]
+    @staticmethod
+    def _attempt_rng(seed: int, attempt: int) -> random.Random:
+        """Return the isolated random stream for one attempt."""
+        return random.Random(f"{seed}-{attempt}")
 
-            if not weekend_eligible:
-                # No one eligible for weekends - this is a problem
-                continue
+    def _run_attempts(
+        self,
+        attempts: range,
+        seed: int,
+        report: Optional[Callable[[int, str, Optional[float]], bool]] = None,
+    ) -> Tuple[float, Optional[ScheduleSnapshot]]:
+        """
+        Run the given randomized attempts and keep the fairest valid result.
+
+        report(finished, phase, best_score) is called after every attempt; if it
+        returns True the remaining attempts are skipped.
+
+        Returns (best_fairness_score, best_snapshot); the snapshot is None if no
+        attempt produced a valid schedule.
+        """
+        best_snapshot = None
+        best_fairness_score = float('inf')
 
-            # ========== PHASE 1: ASSIGN WEEKENDS FIRST ==========
-            phase1_success = self._phase1_assign_weekends(
-                weekend_eligible, max_weekend_diff
+        for finished, attempt in enumerate(attempts, 1):
+            phase = self._run_attempt(
+                attempt, seed, self._weekend_diff_for(attempt), best_fairness_score
             )
-            if not phase1_success:
-                # Relax fairness constraint after many failures
-                if attempt > 0 and attempt % 20 == 0 and max_weekend_diff < 3:
-                    max_weekend_diff += 1
-                continue
 
-            # ========== PHASE 2: ASSIGN THURSDAY NIGHTS ==========
-            phase2_success = self._phase2_assign_thursday_nights()
-            if not phase2_success:
-                continue
+            if phase == "done":
+                # Calculate fairness score
+                score = self._calculate_fairness_score()
 
-            # ========== PHASE 3: FILL REMAINING WEEKDAYS ==========
-            phase3_success = self._phase3_fill_weekdays()
-            if not phase3_success:
-                continue
+                if score < best_fairness_score:
+                    best_fairness_score = score
+                    best_snapshot = self.snapshot()
 
-            # ========== PHASE 4: VALIDATION ==========
-            if not self._validate_coverage():
-                continue
+            best_score = best_fairness_score if best_snapshot is not None else None
+            if report is not None and report(finished, phase, best_score):
+                break
+
+            # If we found a perfect score, stop early
+            if best_fairness_score == 0:
+                break
+
+        return best_fairness_score, best_snapshot
+
+    @staticmethod
+    def _weekend_diff_for(attempt: int) -> int:
+        """
+        Weekend fairness tolerance of an attempt: strict for the first 20
+        attempts, then relaxed by one every 20 attempts up to 3. Derived from the
+        attempt index alone, so batches on a process pool use the same levels.
+        """
+        return min(1 + attempt // 20, 3)
+
+    def _run_attempt(
+        self, attempt: int, seed: int, max_weekend_diff: int, best_fairness_score: float
+    ) -> str:
+        """
+        Build one randomized schedule from scratch.
+        Returns the phase the attempt stopped in, "done" if the schedule is valid.
+        """
+        # Reset all stats
+        for person in self.staff.values():
+            person.reset_monthly_stats()
+
+        self._reset_assignments()
+
+        # Per-attempt random stream for variety between attempts
+        self.rng = self._attempt_rng(seed, attempt)
+
+        # ========== PHASE 0: INITIALIZATION ==========
+        # Process fixed assignments first (holidays, etc.)
+        self._process_fixed_assignments()
+
+        # Identify weekend-eligible staff (exclude holiday workers)
+        weekend_eligible = [
+            p for p in self.staff.values()
+            if not self.is_holiday_worker(p) and p.holiday_shifts == 0
+        ]
+
+        if not weekend_eligible:
+            # No one eligible for weekends - this is a problem
+            return "init"
+
+        # ========== PHASE 1: ASSIGN WEEKENDS FIRST ==========
+        if not self._phase1_assign_weekends(weekend_eligible, max_weekend_diff):
+            return "weekends"
+
+        # Weekend shifts are final now, so most hopeless attempts stop here
+        if self._fairness_lower_bound() >= best_fairness_score:
+            return "bound"
+
+        # ========== PHASE 2: ASSIGN THURSDAY NIGHTS ==========
+        if not self._phase2_assign_thursday_nights():
+            return "thursdays"
+
+        # ========== PHASE 3: FILL REMAINING WEEKDAYS ==========
+        stopped = self._phase3_fill_weekdays(prune_above=best_fairness_score)
+        if stopped:
+            return stopped
+
+        # ========== PHASE 4: VALIDATION ==========
+        if not self._validate_coverage():
+            return "validation"
 
+        is_valid, violations = self._validate_hard_constraints()
+        if not is_valid:
+            return "validation"
+
+        return "done"
+
+    def _run_exact(self, seed: int):
+        """
+        Solve the month with the exact backtracking engine.
+        The outcome is kept in self.exact_result; a feasible solution is applied.
+        """
+        from exact_solver import solve_exact
+
+        for person in self.staff.values():
+            person.reset_monthly_stats()
+        self._reset_assignments()
+        self.rng = self._attempt_rng(seed, 0)
+        self._process_fixed_assignments()
+
+        result = solve_exact(self)
+        if result.status == "feasible":
+            for name, d, shift_type in sorted(result.assignments, key=lambda a: a[1]):
+                self._assign_shift(self.staff[name], d, shift_type)
             is_valid, violations = self._validate_hard_constraints()
             if not is_valid:
-                continue
+                result.status = "unknown"
+                result.reason = violations[0]
 
-            # Calculate fairness score
-            score = self._calculate_fairness_score()
-
-            if score < best_fairness_score:
-                best_fairness_score = score
-                best_schedule = dict(self.schedule)
-                best_stats = {name: (
-                    p.total_shifts, p.day_shifts, p.night_shifts,
-                    p.shifts_24h, p.weekend_shifts, p.holiday_shifts,
-                    p.weighted_total, p.last_day_shift, p.last_night_shift,
-                    set(p.assigned_dates)
-                ) for name, p in self.staff.items()}
-
-                # If we found a perfect score, stop early
-                if score == 0:
+        self.exact_result = result
+        return result
+
+    def _run_attempts_parallel(
+        self,
+        num_attempts: int,
+        workers: int,
+        seed: int,
+        report: Optional[Callable[[int, str, Optional[float]], bool]] = None,
+    ) -> Tuple[float, Optional[ScheduleSnapshot]]:
+        """
+        Run the attempts on a process pool in small chunks, collected as they finish.
+        Every attempt derives its own random stream from (seed, attempt index), and
+        ties go to the lowest attempt index, so the result matches the sequential
+        path for any worker count.
+
+        report is called after each chunk with phase "batch"; if it returns True,
+        chunks that have not started are cancelled and the pool is released
+        without waiting for running ones.
+
+        If no attempt succeeds, the last attempt's partial schedule is restored,
+        as the sequential path leaves it in place.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        workers = min(workers, num_attempts)
+        # A few chunks per worker: frequent progress, cheap cancellation
+        chunk_size = max(1, -(-num_attempts // (workers * 4)))  # Ceiling division
+        config = self._get_config()
+
+        best = (float('inf'), None)
+        best_start = num_attempts
+        last_state = (-1, None)
+        cancelled = False
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                executor.submit(
+                    _run_attempt_batch,
+                    config,
+                    range(start, min(start + chunk_size, num_attempts)),
+                    seed,
+                ): start
+                for start in range(0, num_attempts, chunk_size)
+            }
+            finished = 0
+            for future in as_completed(futures):
+                start = futures[future]
+                score, snapshot, final_state = future.result()
+                if snapshot is not None and (score, start) < (best[0], best_start):
+                    best = (score, snapshot)
+                    best_start = start
+                if final_state is not None and start > last_state[0]:
+                    last_state = (start, final_state)
+
+                finished += min(chunk_size, num_attempts - start)
+                best_score = best[0] if best[1] is not None else None
+                if report is not None and report(finished, "batch", best_score):
+                    cancelled = True
                     break
+        finally:
+            executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
 
-        # Restore the best schedule
-        if best_schedule:
-            self.schedule = best_schedule
-            for name, stats in best_stats.items():
-                p = self.staff[name]
-                (p.total_shifts, p.day_shifts, p.night_shifts,
-                 p.shifts_24h, p.weekend_shifts, p.holiday_shifts,
-                 p.weighted_total, p.last_day_shift, p.last_night_shift,
-                 p.assigned_dates) = stats
-            return True
+        if best[1] is None and last_state[1] is not None:
+            self.restore(last_state[1])
+        return best
 
-        return False
+    def _get_config(self) -> dict:
+        """Return the constructor arguments needed to rebuild this scheduler elsewhere."""
+        return {
+            "year": self.year,
+            "month": self.month,
+            "staff": list(self.staff.values()),
+            "holidays": set(self.holidays),
+            "day_shifts_per_day": self.day_shifts_per_day,
+            "night_shifts_per_day": self.night_shifts_per_day,
+            "history": self.history,
+        }
 
     # ==================== MULTI-STAGE SCHEDULING METHODS ====================
 
@@ -888,7 +1748,8 @@ class Scheduler:
             True if successful, False if constraints cannot be satisfied
         """
         # Get all weekend dates (exclude holidays that fall on weekends)
-        weekend_dates = sorted([d for d in self.weekends if d not in self.holidays])
+        calendar = self.calendar
+        weekend_dates = [self.dates[i] for i in calendar.non_holiday_days if calendar.weekend[i]]
 
         if not weekend_dates:
             return True  # No weekends to assign
@@ -918,15 +1779,9 @@ class Scheduler:
                 continue
 
             # Check if already assigned via fixed assignments
-            day_slots = self.day_shifts_per_day
-            night_slots = self.night_shifts_per_day
-
-            for (name, assigned_date), shift_type in self.schedule.items():
-                if assigned_date == d:
-                    if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
-                        day_slots -= 1
-                    if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                        night_slots -= 1
+            occupancy = self.occupancy[d]
+            day_slots = self.day_shifts_per_day - occupancy.day_count
+            night_slots = self.night_shifts_per_day - occupancy.night_count
 
             # Assign day shifts
             for _ in range(max(0, day_slots)):
@@ -966,7 +1821,8 @@ class Scheduler:
         candidates = []
 
         # Get current min weekend shifts among eligible
-        min_weekend = min(p.weekend_shifts for p in eligible) if eligible else 0
+        weekend_value = self.fairness.weekend_value
+        min_weekend = min(weekend_value(p) for p in eligible) if eligible else 0
 
         for person in eligible:
             # Skip if already assigned this day
@@ -986,13 +1842,13 @@ class Scheduler:
                     continue
 
             # Check fairness constraint
-            if person.weekend_shifts > min_weekend + max_diff:
+            if weekend_value(person) > min_weekend + max_diff:
                 continue
 
             # Score: prefer fewer weekend shifts, then fewer total shifts
-            score = -person.weekend_shifts * 100 - person.total_shifts
+            score = -weekend_value(person) * 100 - self.fairness.total_value(person)
             # Add randomization for tie-breaking
-            score += random.uniform(0, 10)
+            score += self.rng.uniform(0, 10)
             candidates.append((person, score))
 
         if not candidates:
@@ -1020,11 +1876,7 @@ class Scheduler:
                 continue
 
             # Check if already assigned
-            night_slots = self.night_shifts_per_day
-            for (name, assigned_date), shift_type in self.schedule.items():
-                if assigned_date == thursday:
-                    if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                        night_slots -= 1
+            night_slots = self.night_shifts_per_day - self.occupancy[thursday].night_count
 
             if night_slots <= 0:
                 continue  # Already filled
@@ -1079,7 +1931,7 @@ class Scheduler:
             # Score: prioritize those with MORE night shifts (they need the weekend off)
             # Also consider total shifts for balance
             score = person.night_shifts * 10 - person.total_shifts
-            score += random.uniform(0, 5)
+            score += self.rng.uniform(0, 5)
             candidates.append((person, score))
 
         if not candidates:
@@ -1088,7 +1940,7 @@ class Scheduler:
         candidates.sort(key=lambda x: x[1], reverse=True)
         return candidates[0][0]
 
-    def _phase3_fill_weekdays(self) -> bool:
+    def _phase3_fill_weekdays(self, prune_above: float = float('inf')) -> Optional[str]:
         """
         PHASE 3: Fill remaining weekday slots.
 
@@ -1097,37 +1949,37 @@ class Scheduler:
         - Thursday nights are assigned (Phase 2)
         - We just need to fill Mon, Tue, Wed, Fri and remaining slots
 
-        Uses standard greedy scoring with gap constraint enforcement.
+        Each date's Day and Night slots are first filled jointly (see
+        _assign_date_slots); any left open fall back to slot-by-slot greedy
+        scoring with gap constraint enforcement.
+
+        Args:
+            prune_above: Give up once the fairness lower bound reaches this score,
+                since the attempt can no longer beat the best one found so far
 
         Returns:
-            True if successful, False if coverage cannot be achieved
+            None if successful, "weekdays" if coverage cannot be achieved or
+            "bound" if the attempt was pruned
         """
-        # Process each non-weekend, non-holiday date
-        for d in self.dates:
-            # Skip holidays
-            if self.is_holiday(d):
-                continue
-
-            # Skip weekends (already handled in Phase 1)
-            if self.is_weekend(d):
-                continue
+        # Process each non-weekend, non-holiday date (weekends were handled in Phase 1)
+        for i in self.calendar.regular_days:
+            d = self.dates[i]
+
+            # Determine required shifts for this day, minus those already filled
+            occupancy = self.occupancy[d]
+            assigned_today = occupancy.assigned_names
+
+            # Fill all Day and Night slots of the date jointly
+            self._assign_date_slots(
+                d,
+                self.day_shifts_per_day - occupancy.day_count,
+                self.night_shifts_per_day - occupancy.night_count,
+                assigned_today,
+            )
 
-            # Determine required shifts for this day
-            day_slots_needed = self.day_shifts_per_day
-            night_slots_needed = self.night_shifts_per_day
-
-            # Check how many are already filled
-            assigned_today = set()
-            for (name, assigned_date), shift_type in self.schedule.items():
-                if assigned_date == d:
-                    assigned_today.add(name)
-                    if shift_type == ShiftType.DAY:
-                        day_slots_needed -= 1
-                    elif shift_type == ShiftType.NIGHT:
-                        night_slots_needed -= 1
-                    elif shift_type == ShiftType.FULL_24H:
-                        day_slots_needed -= 1
-                        night_slots_needed -= 1
+            # Anything the joint step could not place is retried one slot at a time
+            day_slots_needed = self.day_shifts_per_day - occupancy.day_count
+            night_slots_needed = self.night_shifts_per_day - occupancy.night_count
 
             # Fill Day shifts
             day_filled = 0
@@ -1169,9 +2021,83 @@ class Scheduler:
 
             # Check if this day has sufficient coverage
             if day_filled < day_slots_needed or night_filled < night_slots_needed:
-                return False  # Coverage requirement not met
+                return "weekdays"  # Coverage requirement not met
 
-        return True
+            if self._fairness_lower_bound() >= prune_above:
+                return "bound"  # Cannot beat the best attempt anymore
+
+        return None
+
+    def _assign_date_slots(
+        self, d: date, day_slots: int, night_slots: int, assigned_today: Set[str]
+    ):
+        """
+        Fill a date's open Day and Night slots together as a min-cost bipartite
+        assignment of slots to staff, weighted by _calculate_assignment_score.
+        Unlike filling slot by slot, the only viable Night candidate is not used
+        up by an earlier Day slot. Slots without a valid candidate are left open;
+        assigned names are added to assigned_today.
+        """
+        slot_types, people, costs = self._date_slot_problem(d, day_slots, night_slots, assigned_today)
+        for person, shift_type in self._solve_slot_problem(slot_types, people, costs):
+            if self._assign_shift(person, d, shift_type):
+                assigned_today.add(person.name)
+
+    def _date_slot_problem(
+        self, d: date, day_slots: int, night_slots: int, exclude: Set[str]
+    ) -> Tuple[List[ShiftType], List[Person], Dict[ShiftType, List[float]]]:
+        """Open slots, candidates and one cost row per shift type for a date."""
+        slot_types = [ShiftType.DAY] * max(0, day_slots) + [ShiftType.NIGHT] * max(0, night_slots)
+        people = [p for name, p in self.staff.items() if name not in exclude]
+        costs = {}
+        for shift_type in (ShiftType.DAY, ShiftType.NIGHT):
+            if shift_type in slot_types:
+                costs[shift_type] = [self._slot_cost(person, d, shift_type) for person in people]
+        return slot_types, people, costs
+
+    def _slot_cost(self, person: Person, d: date, shift_type: ShiftType) -> float:
+        """
+        Cost of giving a person one slot: the negated assignment score, with the
+        same -500 penalty as _select_best_candidate for emergency-gap candidates.
+        """
+        if shift_type == ShiftType.NIGHT and d.weekday() == 3:
+            # Thursday night is never valid before a weekend already worked
+            sat = d + timedelta(days=2)
+            sun = d + timedelta(days=3)
+            if sat in person.assigned_dates or sun in person.assigned_dates:
+                return FORBIDDEN_COST
+        if self._can_assign_shift(person, d, shift_type)[0]:
+            return -self._calculate_assignment_score(person, d, shift_type)
+        if self._emergency_can_assign(person, d, shift_type):
+            return 500 - self._calculate_assignment_score(person, d, shift_type)
+        return FORBIDDEN_COST
+
+    def _solve_slot_problem(
+        self,
+        slot_types: List[ShiftType],
+        people: List[Person],
+        costs: Dict[ShiftType, List[float]],
+        noise: float = 0.0,
+    ) -> List[Tuple[Person, ShiftType]]:
+        """
+        Solve a date's slot problem. Returns the (person, shift type) pairs of the
+        slots that could be filled. noise adds random jitter to the valid costs,
+        so repeated calls yield different fillings.
+        """
+        if not slot_types or len(people) < len(slot_types):
+            return []
+        rows = []
+        for shift_type in slot_types:
+            row = costs[shift_type]
+            if noise:
+                row = [c if c >= FORBIDDEN_COST else c + self.rng.uniform(0, noise) for c in row]
+            rows.append(row)
+        columns = _min_cost_assignment(rows)
+        return [
+            (people[column], shift_type)
+            for shift_type, row, column in zip(slot_types, rows, columns)
+            if row[column] < FORBIDDEN_COST
+        ]
 
     def _calculate_fairness_score(self) -> float:
         """
@@ -1186,11 +2112,8 @@ class Scheduler:
         """
         import statistics
 
-        total_days = len(self.dates)
-
-        def normalize(p, value):
-            ratio = p.get_target_ratio(total_days)
-            return value * 2 if ratio == 0.5 else value
+        # Normalized counts (half-month staff doubled) plus carried-over history
+        fairness = self.fairness
 
         # Filter staff by capability
         night_capable = [p for p in self.staff.values() if p.can_do_night]
@@ -1200,13 +2123,13 @@ class Scheduler:
         ]
 
         # Weekend: only compare among non-holiday workers
-        weekend_shifts = [p.weekend_shifts for p in non_holiday_workers] if non_holiday_workers else []
+        weekend_shifts = [fairness.weekend_value(p) for p in non_holiday_workers] if non_holiday_workers else []
 
         # Night: only compare among night-capable staff
-        night_shifts = [normalize(p, p.night_shifts) for p in night_capable] if night_capable else []
+        night_shifts = [fairness.night_value(p) for p in night_capable] if night_capable else []
 
         # Total: compare all staff
-        total_shifts = [normalize(p, p.total_shifts) for p in self.staff.values()]
+        total_shifts = [fairness.total_value(p) for p in self.staff.values()]
 
         def calc_range(lst):
             return max(lst) - min(lst) if lst else 0
@@ -1215,15 +2138,9 @@ class Scheduler:
             return statistics.variance(lst) if len(lst) > 1 else 0
 
         # Calculate score components
-        weekend_range = calc_range(weekend_shifts)
-        night_range = calc_range(night_shifts)
-        total_range = calc_range(total_shifts)
-
-        score = 0
-        # Weekend balance is most critical
-        score += weekend_range * 200 + (weekend_range ** 2 * 100 if weekend_range > 1 else 0)
-        score += night_range * 80 + (40 if night_range > 1 else 0)
-        score += total_range * 40
+        score = self._range_score(
+            calc_range(weekend_shifts), calc_range(night_shifts), calc_range(total_shifts)
+        )
 
         # Add variance for tie-breaking
         score += calc_variance(weekend_shifts) * 10 if weekend_shifts else 0
@@ -1236,24 +2153,215 @@ class Scheduler:
 
         return score
 
-    def _validate_coverage(self) -> bool:
-        """Validate that all non-holiday days have required coverage."""
-        for d in self.dates:
-            # Skip holidays - coverage is handled via FixedOn (lottery)
-            if self.is_holiday(d):
+    @staticmethod
+    def _range_score(weekend_range: int, night_range: int, total_range: int) -> float:
+        """Range part of the fairness score (weekend balance is most critical)."""
+        score = 0
+        score += weekend_range * 200 + (weekend_range ** 2 * 100 if weekend_range > 1 else 0)
+        score += night_range * 80 + (40 if night_range > 1 else 0)
+        score += total_range * 40
+        return score
+
+    def _incremental_fairness_score(self) -> float:
+        """
+        _calculate_fairness_score computed in O(1) from the fairness aggregates.
+        Omits the holiday-worker weekend penalty, so callers must only make
+        assignments that pass the hard constraints.
+        """
+        fairness = self.fairness
+        score = self._range_score(
+            fairness.weekends.range(), fairness.capable_nights.range(), fairness.totals.range()
+        )
+        score += fairness.weekends.variance() * 10
+        score += fairness.capable_nights.variance() * 8
+        return score
+
+    def _fairness_lower_bound(self) -> float:
+        """
+        Lower bound on _calculate_fairness_score for any completion of the current
+        partial schedule during generation (shift counts only grow).
+
+        For each group the current max can only rise, while the final min is at
+        most the group's normalized average once every open slot is filled.
+        Variance terms are left out (they are non-negative).
+        """
+        open_slots = 0
+        open_nights = 0
+        open_weekend_slots = 0
+        weekend = self.calendar.weekend
+        for i in self.calendar.non_holiday_days:
+            occupancy = self.occupancy[self.dates[i]]
+            open_day = max(0, self.day_shifts_per_day - occupancy.day_count)
+            open_night = max(0, self.night_shifts_per_day - occupancy.night_count)
+            open_slots += open_day + open_night
+            open_nights += open_night
+            if weekend[i]:
+                open_weekend_slots += open_day + open_night
+
+        fairness = self.fairness
+        staff = list(self.staff.values())
+        night_capable = [p for p in staff if p.can_do_night]
+        comparable = [p for p in staff if fairness.is_weekend_comparable(p)]
+
+        weekend_range = self._range_lower_bound(
+            fairness.weekends, comparable, sum(p.weekend_shifts for p in comparable),
+            open_weekend_slots, fairness.carry_weekends, normalized=False,
+        )
+        night_range = self._range_lower_bound(
+            fairness.capable_nights, night_capable, sum(p.night_shifts for p in night_capable),
+            open_nights, fairness.carry_nights,
+        )
+        total_range = self._range_lower_bound(
+            fairness.totals, staff, sum(p.total_shifts for p in staff), open_slots,
+            fairness.carry_totals,
+        )
+        return self._range_score(weekend_range, night_range, total_range)
+
+    def _range_lower_bound(
+        self, histogram: "_ValueHistogram", group: List[Person], raw_sum: int,
+        remaining: int, carry: Dict[str, int], normalized: bool = True,
+    ) -> int:
+        """
+        Lower bound on the final max - min of a group that can gain at most
+        `remaining` more shifts in total.
+        """
+        if not histogram.size:
+            return 0
+        if remaining == 0:
+            return histogram.range()
+        # Every member ends with value raw * multiplier + carry >= final min, i.e.
+        # raw >= (min - carry) / multiplier, so final min * sum(1 / multiplier) <=
+        # total raw shifts + sum(carry / multiplier). Doubled to stay in integers.
+        if normalized:
+            weights = [2 // self.fairness.normalize(p, 1) for p in group]
+        else:
+            weights = [2] * len(group)
+        capacity = sum(weights)
+        carried = sum(w * carry.get(p.name, 0) for p, w in zip(group, weights))
+        final_min_bound = (2 * (raw_sum + remaining) + carried) // capacity
+        return max(0, histogram.max - final_min_bound)
+
+    def check_feasibility(self) -> FeasibilityReport:
+        """
+        Fast capacity analysis of the configuration, run before any attempt.
+
+        Compares staff supply with slot demand using necessary conditions only
+        (relaxed emergency night gap, no fairness rules), so a reported issue
+        means no valid schedule exists. FixedOn assignments are placed regardless
+        of gap rules, so the slots they cover (both slots for a 24h shift) are
+        taken out of the demand and their holders out of that date's supply;
+        the checks below apply to the remaining, freely assigned slots:
+        - Per date: available staff vs. Day + Night slots, night-capable staff
+          vs. Night slots
+        - Sliding windows of EMERGENCY_NIGHT_TO_NIGHT_GAP dates: a person works
+          at most one free night per window
+        - Sliding windows of MIN_DAY_TO_DAY_GAP dates: a person works at most
+          one free day shift per window
+        - Weekends: staff other than holiday workers, one shift per weekend each
+
+        Returns a FeasibilityReport listing every shortfall found. The report is
+        kept in self.feasibility_report and reused by later calls, so callers
+        may check before generate_schedule() without paying for it twice.
+        """
+        if self.feasibility_report is not None:
+            return self.feasibility_report
+
+        report = FeasibilityReport()
+        people = list(self.staff.values())
+        workdays = ~self.calendar.holiday
+        available = np.array(
+            [[person.is_available_on(d) for d in self.dates] for person in people], dtype=bool
+        ).reshape(len(people), len(self.dates))
+        available &= workdays
+        night_capable = np.array([p.can_do_night for p in people], dtype=bool)
+        weekend_ok = np.array([not self.is_holiday_worker(p) for p in people], dtype=bool)
+
+        # Slots already covered by FixedOn assignments; their holders are busy that date
+        fixed_day = np.zeros_like(available)
+        fixed_night = np.zeros_like(available)
+        for row, person in enumerate(people):
+            for d, shift_type in person.fixed_on_dates.items():
+                i = self.calendar.index_of(d)
+                if i == NO_DAY:
+                    continue
+                fixed_day[row, i] |= shift_type in (ShiftType.DAY, ShiftType.FULL_24H)
+                fixed_night[row, i] |= shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H)
+        available &= ~(fixed_day | fixed_night)
+        day_demand = np.maximum(self.day_shifts_per_day - fixed_day.sum(axis=0), 0) * workdays
+        night_demand = np.maximum(self.night_shifts_per_day - fixed_night.sum(axis=0), 0) * workdays
+
+        def add_issue(kind, dates, shift_type, required, supply, message):
+            report.issues.append(
+                FeasibilityIssue(kind, dates, shift_type, int(required), int(supply), message)
+            )
+
+        # Per-date supply
+        for i, d in enumerate(self.dates):
+            if not workdays[i]:
                 continue
+            weekend = self.calendar.weekend[i]
+            staff_ok = available[:, i] & weekend_ok if weekend else available[:, i]
+            required = day_demand[i] + night_demand[i]
+            supply = staff_ok.sum()
+            if supply < required:
+                add_issue(
+                    "weekend_supply" if weekend else "date_supply", [d], None,
+                    required, supply,
+                    f"{d}: {required} shifts needed but only {supply} staff available",
+                )
+            supply = (staff_ok & night_capable).sum()
+            if supply < night_demand[i]:
+                add_issue(
+                    "weekend_supply" if weekend else "date_supply", [d], ShiftType.NIGHT,
+                    night_demand[i], supply,
+                    f"{d}: {night_demand[i]} Night shifts needed but only "
+                    f"{supply} night-capable staff available",
+                )
+
+        # Sliding windows: at most one night (day) shift per person per window
+        for kind, window, shift_type, demand, capable in (
+            ("night_window", self.EMERGENCY_NIGHT_TO_NIGHT_GAP, ShiftType.NIGHT,
+             night_demand, night_capable),
+            ("day_window", self.MIN_DAY_TO_DAY_GAP, ShiftType.DAY,
+             day_demand, np.ones(len(people), dtype=bool)),
+        ):
+            for start in range(len(self.dates) - window + 1):
+                end = start + window
+                required = demand[start:end].sum()
+                supply = (available[:, start:end].any(axis=1) & capable).sum()
+                if supply < required:
+                    dates = self.dates[start:end]
+                    add_issue(
+                        kind, dates, shift_type, required, supply,
+                        f"{dates[0]} to {dates[-1]}: {required} {shift_type.value} shifts "
+                        f"needed but only {supply} eligible staff (one {shift_type.value} "
+                        f"shift each per {window} days)",
+                    )
 
-            day_count = 0
-            night_count = 0
+        # Weekends: one shift per weekend per person, no holiday workers
+        for i in range(len(self.dates)):
+            if self.calendar.weekend_pair[i] != i + 1:
+                continue  # Only full Saturday-Sunday weekends
+            pair = available[:, i:i + 2] & weekend_ok[:, None]
+            required = (day_demand[i:i + 2] + night_demand[i:i + 2]).sum()
+            supply = pair.any(axis=1).sum()
+            if supply < required:
+                dates = self.dates[i:i + 2]
+                add_issue(
+                    "weekend_supply", dates, None, required, supply,
+                    f"Weekend {dates[0]}: {required} shifts needed but only {supply} "
+                    f"staff can work it (one shift per weekend, holiday workers excluded)",
+                )
 
-            for (name, assigned_date), shift_type in self.schedule.items():
-                if assigned_date == d:
-                    if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
-                        day_count += 1
-                    if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                        night_count += 1
+        self.feasibility_report = report
+        return report
 
-            if day_count < 1 or night_count < 1:
+    def _validate_coverage(self) -> bool:
+        """Validate that all non-holiday days have required coverage."""
+        # Holidays are skipped - coverage is handled via FixedOn (lottery)
+        for i in self.calendar.non_holiday_days:
+            occupancy = self.occupancy[self.dates[i]]
+            if occupancy.day_count < 1 or occupancy.night_count < 1:
                 return False
 
         return True
@@ -1309,6 +2417,422 @@ class Scheduler:
 
         return len(violations) == 0, violations
 
+    # ==================== LOCAL SEARCH ====================
+
+    def improve_schedule(self, max_passes: int = 10) -> float:
+        """
+        Improve a complete schedule by local search.
+
+        Each pass visits every movable assignment and tries, in order:
+        1. Move: give the shift to another person
+        2. Swap: exchange it with another person's shift (same or different date)
+        The first change that keeps all hard constraints and lowers the fairness
+        score is kept. Stops after a pass without improvement.
+
+        Returns the fairness score after optimization.
+        """
+        current = self._incremental_fairness_score()
+
+        for _ in range(max_passes):
+            improved = False
+            assignments = [
+                (name, d, shift_type) for (name, d), shift_type in self.schedule.items()
+                if self._is_movable(name, d, shift_type)
+            ]
+            self.rng.shuffle(assignments)
+
+            for name, d, shift_type in assignments:
+                # Skip assignments already changed earlier in this pass
+                if self.schedule.get((name, d)) != shift_type:
+                    continue
+
+                score = self._try_move(name, d, shift_type, current)
+                if score is None:
+                    score = self._try_swap(name, d, shift_type, current)
+                if score is not None:
+                    current = score
+                    improved = True
+
+            if not improved:
+                break
+
+        return current
+
+    def _is_movable(self, name: str, d: date, shift_type: ShiftType) -> bool:
+        """Fixed-on, holiday and 24h assignments are never changed by local search."""
+        if shift_type == ShiftType.FULL_24H or self.is_holiday(d):
+            return False
+        return self.staff[name].fixed_on_dates.get(d) != shift_type
+
+    def _can_take_shift(self, person: Person, d: date, shift_type: ShiftType) -> bool:
+        """
+        Hard-constraint check for moving an existing shift to a person.
+        Adds the checks _basic_can_assign leaves to the phase order: runtime holiday
+        workers on weekends, and Thursday nights before a weekend already worked.
+        """
+        if not self._basic_can_assign(person, d, shift_type):
+            return False
+        if self.is_weekend(d) and person.holiday_shifts > 0:
+            return False
+        if d.weekday() == 3 and shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
+            sat = d + timedelta(days=2)
+            sun = d + timedelta(days=3)
+            if sat in person.assigned_dates or sun in person.assigned_dates:
+                return False
+        return True
+
+    def _apply_move(self, person: Person, other: Person, d: date, shift_type: ShiftType) -> bool:
+        """Give person's shift on d to other if allowed. Leaves the schedule unchanged otherwise."""
+        if not self._can_take_shift(other, d, shift_type):
+            return False
+        self._unassign_shift(person, d)
+        if self._assign_shift(other, d, shift_type):
+            return True
+        self._assign_shift(person, d, shift_type)
+        return False
+
+    def _undo_move(self, person: Person, other: Person, d: date, shift_type: ShiftType):
+        """Revert _apply_move without re-checking constraints."""
+        self._unassign_shift(other, d)
+        self._assign_shift(person, d, shift_type)
+
+    def _apply_swap(
+        self, person: Person, d: date, shift_type: ShiftType,
+        other: Person, other_d: date, other_type: ShiftType,
+    ) -> bool:
+        """Exchange two people's shifts if allowed. Leaves the schedule unchanged otherwise."""
+        self._unassign_shift(person, d)
+        self._unassign_shift(other, other_d)
+
+        if (self._can_take_shift(person, other_d, other_type)
+                and self._assign_shift(person, other_d, other_type)):
+            if (self._can_take_shift(other, d, shift_type)
+                    and self._assign_shift(other, d, shift_type)):
+                return True
+            self._unassign_shift(person, other_d)
+
+        self._assign_shift(person, d, shift_type)
+        self._assign_shift(other, other_d, other_type)
+        return False
+
+    def _undo_swap(
+        self, person: Person, d: date, shift_type: ShiftType,
+        other: Person, other_d: date, other_type: ShiftType,
+    ):
+        """Revert _apply_swap without re-checking constraints."""
+        self._unassign_shift(person, other_d)
+        self._unassign_shift(other, d)
+        self._assign_shift(person, d, shift_type)
+        self._assign_shift(other, other_d, other_type)
+
+    def _try_move(
+        self, name: str, d: date, shift_type: ShiftType, current: float
+    ) -> Optional[float]:
+        """Try giving the shift to someone else. Returns the new score if kept."""
+        person = self.staff[name]
+
+        for other in self.staff.values():
+            if other.name == name or not self._apply_move(person, other, d, shift_type):
+                continue
+            score = self._incremental_fairness_score()
+            if score < current - 1e-9:
+                return score
+            self._undo_move(person, other, d, shift_type)
+
+        return None
+
+    def _try_swap(
+        self, name: str, d: date, shift_type: ShiftType, current: float
+    ) -> Optional[float]:
+        """Try exchanging the shift with another person's shift. Returns the new score if kept."""
+        person = self.staff[name]
+        partners = [
+            (other_name, other_d, other_type)
+            for (other_name, other_d), other_type in self.schedule.items()
+            if other_name != name
+            and (other_d, other_type) != (d, shift_type)
+            and self._is_movable(other_name, other_d, other_type)
+        ]
+
+        for other_name, other_d, other_type in partners:
+            other = self.staff[other_name]
+            if not self._apply_swap(person, d, shift_type, other, other_d, other_type):
+                continue
+            score = self._incremental_fairness_score()
+            if score < current - 1e-9:
+                return score
+            self._undo_swap(person, d, shift_type, other, other_d, other_type)
+
+        return None
+
+    # ==================== SIMULATED ANNEALING ====================
+
+    def anneal_schedule(
+        self,
+        time_budget_ms: int = 2000,
+        start_temperature: float = 100.0,
+        end_temperature: float = 0.5,
+    ) -> float:
+        """
+        Improve a complete schedule by simulated annealing until the time budget runs out.
+
+        Each step proposes a random move (shift to another person) or swap (two
+        people exchange shifts). Proposals that break a hard constraint are rejected
+        before evaluation, so the search only visits valid schedules. Score changes
+        come from the incremental fairness aggregates. Worse schedules are accepted
+        with probability exp(-delta / T), and T cools geometrically over the budget.
+        The best schedule seen is restored at the end.
+
+        Returns the fairness score of the restored schedule.
+        """
+        current = self._incremental_fairness_score()
+        best = current
+        best_snapshot = self.snapshot()
+
+        # Movable assignments, kept in sync as moves are accepted
+        moves = [
+            (name, d, shift_type) for (name, d), shift_type in self.schedule.items()
+            if self._is_movable(name, d, shift_type)
+        ]
+        if not moves or len(self.staff) < 2:
+            return current
+
+        rng = self.rng
+        budget = time_budget_ms / 1000
+        cooling = end_temperature / start_temperature
+        start = time.perf_counter()
+
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= budget:
+                break
+            temperature = start_temperature * cooling ** (elapsed / budget)
+
+            i = rng.randrange(len(moves))
+            name, d, shift_type = moves[i]
+            person = self.staff[name]
+
+            if rng.random() < 0.5:
+                # Move: give the shift to a random other person
+                other = self.staff[rng.choice(self.staff_names)]
+                if other is person or not self._apply_move(person, other, d, shift_type):
+                    continue
+                score = self._incremental_fairness_score()
+                if self._accept(score - current, temperature):
+                    current = score
+                    moves[i] = (other.name, d, shift_type)
+                else:
+                    self._undo_move(person, other, d, shift_type)
+            else:
+                # Swap: exchange with another random movable assignment
+                j = rng.randrange(len(moves))
+                other_name, other_d, other_type = moves[j]
+                if other_name == name:
+                    continue
+                other = self.staff[other_name]
+                if not self._apply_swap(person, d, shift_type, other, other_d, other_type):
+                    continue
+                score = self._incremental_fairness_score()
+                if self._accept(score - current, temperature):
+                    current = score
+                    moves[i] = (name, other_d, other_type)
+                    moves[j] = (other_name, d, shift_type)
+                else:
+                    self._undo_swap(person, d, shift_type, other, other_d, other_type)
+
+            if current < best - 1e-9:
+                best = current
+                best_snapshot = self.snapshot()
+
+        if best < current:
+            self.restore(best_snapshot)
+        return best
+
+    def _accept(self, delta: float, temperature: float) -> bool:
+        """Metropolis acceptance rule."""
+        if delta <= 0:
+            return True
+        return self.rng.random() < math.exp(-delta / temperature)
+
+    # ==================== BEAM SEARCH ====================
+
+    def beam_schedule(self, beam_width: int = 8, branching: int = 3, noise: float = 20.0) -> Optional[float]:
+        """
+        Build a schedule date by date, keeping the beam_width best partial schedules.
+
+        Dates follow the phase order: weekends, Thursdays, then the remaining
+        weekdays. Every partial schedule is expanded with up to `branching`
+        distinct joint fillings of the next date (the first one unperturbed, the
+        others with cost jitter of up to `noise`), and all children are ranked by
+        their partial fairness score. Partial schedules are linked lists of
+        per-date assignments, so the scheduler only replays the difference when
+        switching between them. Cost grows linearly with beam_width.
+
+        Returns the fairness score of the completed schedule, or None if no
+        partial schedule could be completed.
+        """
+        for person in self.staff.values():
+            person.reset_monthly_stats()
+        self._reset_assignments()
+        self._process_fixed_assignments()
+
+        cal = self.calendar
+        workdays = np.flatnonzero(~cal.holiday)
+        order = [
+            self.dates[i]
+            for group in (cal.weekend, cal.thursday, ~(cal.weekend | cal.thursday))
+            for i in workdays[group[workdays]]
+        ]
+
+        beam: List[Optional[_BeamNode]] = [None]
+        current = None
+        for depth, d in enumerate(order, 1):
+            children = []
+            for node in beam:
+                current = self._beam_goto(current, node)
+                occupancy = self.occupancy[d]
+                day_slots = self.day_shifts_per_day - occupancy.day_count
+                night_slots = self.night_shifts_per_day - occupancy.night_count
+                slot_types, people, costs = self._date_slot_problem(
+                    d, day_slots, night_slots, occupancy.assigned_names
+                )
+
+                seen = set()
+                for sample in range(branching):
+                    filling = self._solve_slot_problem(
+                        slot_types, people, costs, noise if sample else 0.0
+                    )
+                    if len(filling) < len(slot_types):
+                        break
+                    key = frozenset((person.name, shift_type) for person, shift_type in filling)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    child = _BeamNode(
+                        node,
+                        tuple((person.name, d, shift_type) for person, shift_type in filling),
+                        depth,
+                    )
+                    if self._beam_apply(child):
+                        children.append((self._fairness_lower_bound(), self._incremental_fairness_score(), child))
+                        self._beam_revert(child)
+
+            if not children:
+                self._beam_goto(current, None)
+                return None
+            children.sort(key=lambda c: c[:2])
+            beam = [child for _, _, child in children[:beam_width]]
+
+        self._beam_goto(current, beam[0])
+        if not self._validate_coverage() or not self._validate_hard_constraints()[0]:
+            return None
+        return self._calculate_fairness_score()
+
+    def _beam_apply(self, node: _BeamNode) -> bool:
+        """Apply one node's assignments. Leaves the schedule unchanged if one fails."""
+        for i, (name, d, shift_type) in enumerate(node.assignments):
+            if not self._assign_shift(self.staff[name], d, shift_type):
+                for other_name, other_d, _ in node.assignments[:i]:
+                    self._unassign_shift(self.staff[other_name], other_d)
+                return False
+        return True
+
+    def _beam_revert(self, node: _BeamNode):
+        for name, d, _ in node.assignments:
+            self._unassign_shift(self.staff[name], d)
+
+    def _beam_goto(
+        self, current: Optional[_BeamNode], target: Optional[_BeamNode]
+    ) -> Optional[_BeamNode]:
+        """Move the schedule from one partial schedule to another via their common ancestor."""
+        path = []
+        while target is not current:
+            current_depth = current.depth if current else 0
+            target_depth = target.depth if target else 0
+            if current_depth >= target_depth:
+                self._beam_revert(current)
+                current = current.parent
+            else:
+                path.append(target)
+                target = target.parent
+        for node in reversed(path):
+            self._beam_apply(node)
+        return path[0] if path else current
+
+    # ==================== LARGE NEIGHBOURHOOD SEARCH ====================
+
+    def lns_schedule(
+        self,
+        time_budget_ms: int = 2000,
+        window_days: int = 7,
+        node_limit: int = 2000,
+    ) -> float:
+        """
+        Improve a complete schedule by large-neighbourhood search until the time budget runs out.
+
+        Each step frees every movable assignment in a window of dates (window_days
+        consecutive dates, or a weekend plus its Thursday) and re-fills the window
+        with the exact solver against the rest of the schedule, which stays fixed.
+        The new fill is kept unless it makes _calculate_fairness_score() worse.
+        The search only branches over the freed slots, but building the solver's
+        sub-problem and re-scoring the schedule still scan the whole month, so
+        each step costs O(staff x dates) on top of the window search.
+
+        Returns the fairness score of the final schedule.
+        """
+        from exact_solver import solve_exact
+
+        current = self._calculate_fairness_score()
+        windows = self._lns_windows(window_days)
+        if not windows:
+            return current
+
+        rng = self.rng
+        budget = time_budget_ms / 1000
+        start = time.perf_counter()
+
+        while time.perf_counter() - start < budget:
+            window = rng.choice(windows)
+            freed = [
+                (name, d, shift_type)
+                for d in window
+                for name in sorted(self.occupancy[d].assigned_names)
+                for shift_type in (self.schedule[(name, d)],)
+                if self._is_movable(name, d, shift_type)
+            ]
+            if not freed:
+                continue
+            for name, d, _ in freed:
+                self._unassign_shift(self.staff[name], d)
+
+            result = solve_exact(self, node_limit)
+            if result.status == "feasible":
+                for name, d, shift_type in result.assignments:
+                    self._assign_shift(self.staff[name], d, shift_type)
+                score = self._calculate_fairness_score()
+                if score <= current:
+                    current = score
+                    continue
+                for name, d, _ in result.assignments:
+                    self._unassign_shift(self.staff[name], d)
+
+            for name, d, shift_type in freed:
+                self._assign_shift(self.staff[name], d, shift_type)
+
+        return current
+
+    def _lns_windows(self, window_days: int) -> List[List[date]]:
+        """Sliding windows of consecutive dates plus Thursday-to-Sunday blocks."""
+        window_days = min(window_days, len(self.dates))
+        windows = [
+            self.dates[i:i + window_days]
+            for i in range(len(self.dates) - window_days + 1)
+        ]
+        for i in np.flatnonzero(self.calendar.thursday):
+            windows.append(self.dates[i:i + 4])
+        return windows
+
     def get_schedule_dict(self) -> Dict[Tuple[str, date], str]:
         """Return schedule as dict with string shift types."""
         return {
@@ -1316,34 +2840,66 @@ class Scheduler:
             for (name, d), shift_type in self.schedule.items()
         }
 
+    def get_shift_code(self, name: str, d: date) -> int:
+        """Return the schedule matrix code for a person on a date."""
+        return int(self.schedule_matrix[self.staff_index[name], self.date_index[d]])
+
+    def get_shift_counts(self) -> Dict[str, np.ndarray]:
+        """
+        Per-person shift counts reduced from the schedule matrix.
+        Each array is indexed like staff_names. 24h shifts count as both Day and Night.
+        """
+        matrix = self.schedule_matrix
+        assigned = matrix != NO_SHIFT
+        full = (matrix == SHIFT_CODES[ShiftType.FULL_24H]).sum(axis=1)
+        weekend_mask = self.calendar.weekend
+        holiday_mask = self.calendar.holiday
+        return {
+            "total": assigned.sum(axis=1),
+            "day": (matrix == SHIFT_CODES[ShiftType.DAY]).sum(axis=1) + full,
+            "night": (matrix == SHIFT_CODES[ShiftType.NIGHT]).sum(axis=1) + full,
+            "24h": full,
+            "weekend": assigned[:, weekend_mask].sum(axis=1),
+            "holiday": assigned[:, holiday_mask].sum(axis=1),
+            "weighted": CODE_WEIGHTS[matrix].sum(axis=1),
+        }
+
     def get_staff_stats(self) -> Dict[str, dict]:
         """Return statistics for all staff."""
-        return {name: person.get_stats_dict() for name, person in self.staff.items()}
+        counts = self.get_shift_counts()
+        return {
+            name: {
+                "target_shifts": round(self.staff[name].target_shifts, 1),
+                "total_shifts": int(counts["total"][i]),
+                "day_shifts": int(counts["day"][i]),
+                "night_shifts": int(counts["night"][i]),
+                "24h_shifts": int(counts["24h"][i]),
+                "weekend_shifts": int(counts["weekend"][i]),
+                "holiday_shifts": int(counts["holiday"][i]),
+                "weighted_total": int(counts["weighted"][i]),
+            }
+            for i, name in enumerate(self.staff_names)
+        }
 
     def get_fairness_metrics(self) -> dict:
         """Calculate fairness metrics for the schedule."""
-        import statistics
-
         if not self.staff:
             return {}
 
-        total_shifts = [p.total_shifts for p in self.staff.values()]
-        night_shifts = [p.night_shifts for p in self.staff.values()]
-        weekend_shifts = [p.weekend_shifts for p in self.staff.values()]
-        weighted = [p.weighted_total for p in self.staff.values()]
+        counts = self.get_shift_counts()
 
         def safe_stdev(data):
-            return statistics.stdev(data) if len(data) > 1 else 0
+            return float(data.std(ddof=1)) if len(data) > 1 else 0
 
         return {
-            "total_shifts_mean": statistics.mean(total_shifts),
-            "total_shifts_stdev": safe_stdev(total_shifts),
-            "night_shifts_mean": statistics.mean(night_shifts),
-            "night_shifts_stdev": safe_stdev(night_shifts),
-            "weekend_shifts_mean": statistics.mean(weekend_shifts),
-            "weekend_shifts_stdev": safe_stdev(weekend_shifts),
-            "weighted_mean": statistics.mean(weighted),
-            "weighted_stdev": safe_stdev(weighted),
+            "total_shifts_mean": float(counts["total"].mean()),
+            "total_shifts_stdev": safe_stdev(counts["total"]),
+            "night_shifts_mean": float(counts["night"].mean()),
+            "night_shifts_stdev": safe_stdev(counts["night"]),
+            "weekend_shifts_mean": float(counts["weekend"].mean()),
+            "weekend_shifts_stdev": safe_stdev(counts["weekend"]),
+            "weighted_mean": float(counts["weighted"].mean()),
+            "weighted_stdev": safe_stdev(counts["weighted"]),
         }
 
     def reschedule_for_leave(
@@ -1377,26 +2933,8 @@ class Scheduler:
 
         # For each shift, find a replacement
         for d, shift_type in shifts_to_reassign:
-            # Remove the shift from leave person
-            del self.schedule[(leave_person_name, d)]
-            leave_person.assigned_dates.discard(d)
-
-            # Update stats for leave person
-            weight = SHIFT_WEIGHTS[shift_type]
-            leave_person.weighted_total -= weight
-            leave_person.total_shifts -= 1
-            if shift_type == ShiftType.DAY:
-                leave_person.day_shifts -= 1
-            elif shift_type == ShiftType.NIGHT:
-                leave_person.night_shifts -= 1
-            elif shift_type == ShiftType.FULL_24H:
-                leave_person.shifts_24h -= 1
-                leave_person.day_shifts -= 1
-                leave_person.night_shifts -= 1
-            if self.is_weekend(d):
-                leave_person.weekend_shifts -= 1
-            if self.is_holiday(d):
-                leave_person.holiday_shifts -= 1
+            # Remove the shift from leave person and update their stats
+            self._unassign_shift(leave_person, d)
 
             # Find replacement - prioritize people with fewer total shifts
             # MUST find someone to maintain coverage
@@ -1579,22 +3117,19 @@ class Scheduler:
     def get_coverage_summary(self) -> List[dict]:
         """Get coverage summary for each day."""
         summary = []
-        for d in self.dates:
-            day_staff = []
-            night_staff = []
-
-            for (name, assigned_date), shift_type in self.schedule.items():
-                if assigned_date == d:
-                    if shift_type in (ShiftType.DAY, ShiftType.FULL_24H):
-                        day_staff.append(name)
-                    if shift_type in (ShiftType.NIGHT, ShiftType.FULL_24H):
-                        night_staff.append(name)
+        names = np.array(self.staff_names, dtype=object)
+        matrix = self.schedule_matrix
+        on_day = (matrix == SHIFT_CODES[ShiftType.DAY]) | (matrix == SHIFT_CODES[ShiftType.FULL_24H])
+        on_night = (matrix == SHIFT_CODES[ShiftType.NIGHT]) | (matrix == SHIFT_CODES[ShiftType.FULL_24H])
+        for i, d in enumerate(self.dates):
+            day_staff = names[on_day[:, i]].tolist()
+            night_staff = names[on_night[:, i]].tolist()
 
             summary.append({
                 "date": d,
                 "day_of_week": d.strftime("%a"),
-                "is_weekend": self.is_weekend(d),
-                "is_holiday": self.is_holiday(d),
+                "is_weekend": bool(self.calendar.weekend[i]),
+                "is_holiday": bool(self.calendar.holiday[i]),
                 "day_coverage": len(day_staff),
                 "night_coverage": len(night_staff),
                 "day_staff": day_staff,
@@ -1604,68 +3139,61 @@ class Scheduler:
         return summary
 
 
-def create_staff_from_dataframe(df, year: int, month: int) -> List[Person]:
+def _run_attempt_batch(config: dict, attempts: range, seed: int):
+    """
+    Process-pool entry point: rebuild a Scheduler from its config and run a batch
+    of attempts. Returns Scheduler._run_attempts' (score, snapshot) plus a
+    snapshot of the final state when the batch found no valid schedule.
+    """
+    scheduler = Scheduler(**config)
+    score, snapshot = scheduler._run_attempts(attempts, seed)
+    return score, snapshot, scheduler.snapshot() if snapshot is None else None
+
+
+def create_staff_from_dataframe(df, year: int, month: int, compact: bool = False) -> List[Person]:
     """
     Create Person objects from a pandas DataFrame.
+    With compact=True, CompactPerson objects are returned instead.
 
     Expected columns:
     - Name: str
-    - CanDoNight: bool
+    - CanDoNight: bool (text is read by utils.coerce_bool_column: "false", "0",
+      "no", "n", "f", "off" and blank text count as False)
     - CanDo24h: bool
     - FixedOff: str (comma-separated dates or ranges like "17-20")
     - FixedOn: str (comma-separated "date:shift_type")
     """
-    from utils import parse_date_list
+    from utils import parse_staff_constraints, read_staff_columns
 
     staff = []
+    columns = read_staff_columns(df)
 
-    for _, row in df.iterrows():
-        name = str(row.get("Name", "")).strip()
+    for name, fixed_off_str, fixed_on_str, can_do_night, can_do_24h in zip(
+        columns.names, columns.fixed_off, columns.fixed_on,
+        columns.can_do_night, columns.can_do_24h,
+    ):
         if not name:
             continue
 
-        # Parse fixed off dates (supports ranges like "17-20")
-        fixed_off_str = str(row.get("FixedOff", ""))
-        fixed_off = set(parse_date_list(fixed_off_str, year, month))
-
-        # Parse fixed on dates (format: "1:Day,5:Night")
+        # Parse fixed off dates (supports ranges like "17-20") and fixed on
+        # dates (format: "1:Day,5:Night"); shared with the app's validation
+        parsed = parse_staff_constraints(fixed_off_str, fixed_on_str, year, month)
         fixed_on = {}
-        fixed_on_str = str(row.get("FixedOn", ""))
-        if fixed_on_str and fixed_on_str.strip() and fixed_on_str.lower() != "nan":
-            # Normalize separators: Chinese comma/colon to English
-            fixed_on_str = fixed_on_str.replace("，", ",").replace("；", ",").replace("：", ":")
-            for part in fixed_on_str.split(","):
-                part = part.strip()
-                if ":" in part:
-                    try:
-                        date_part, shift_part = part.split(":", 1)
-                        date_part = date_part.strip()
-                        shift_part = shift_part.strip()
-
-                        # Parse date
-                        if "-" in date_part:
-                            d = date.fromisoformat(date_part)
-                        else:
-                            d = date(year, month, int(date_part))
-
-                        # Parse shift type
-                        shift_map = {
-                            "Day": ShiftType.DAY,
-                            "Night": ShiftType.NIGHT,
-                            "24h": ShiftType.FULL_24H,
-                        }
-                        if shift_part in shift_map:
-                            fixed_on[d] = shift_map[shift_part]
-                    except (ValueError, TypeError):
-                        continue
+        for d, shift_label in parsed.fixed_on:
+            if shift_label in FIXED_ON_SHIFTS:
+                fixed_on[d] = FIXED_ON_SHIFTS[shift_label]
 
         person = Person(
             name=name,
-            can_do_night=bool(row.get("CanDoNight", True)),
-            can_do_24h=bool(row.get("CanDo24h", True)),
-            fixed_off_dates=fixed_off,
+            can_do_night=can_do_night,
+            can_do_24h=can_do_24h,
+            fixed_off_dates=set(parsed.fixed_off),
             fixed_on_dates=fixed_on,
         )
         staff.append(person)
 
+    if compact:
+        calendar = get_calendar_table(year, month)
+        staff = [CompactPerson.from_person(person, calendar) for person in staff]
+
     return staff
@@ -0,0 +1,16 @@
+"""Shared fixtures for the scheduler test suite."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_default_staff_data  # noqa: E402
+
+
+@pytest.fixture
+def staff_df():
+    """The app's demo roster (10 people, two of them half-month)."""
+    return get_default_staff_data()
@@ -0,0 +1,43 @@
+"""Tests for the shared per-month calendar tables."""
+
+from datetime import date, timedelta
+
+from calendar_table import get_calendar_table
+from scheduler_logic import Person, Scheduler
+
+
+def weekend_pair(d):
+    return {5: d + timedelta(days=1), 6: d - timedelta(days=1)}.get(d.weekday())
+
+
+def comp_thursday(d):
+    return {5: d - timedelta(days=2), 6: d - timedelta(days=3)}.get(d.weekday())
+
+
+def test_tables_are_shared():
+    holidays = {date(2026, 1, 1)}
+    assert get_calendar_table(2026, 1, holidays) is get_calendar_table(2026, 1, set(holidays))
+    assert get_calendar_table(2026, 1, holidays) is not get_calendar_table(2026, 1)
+
+
+def test_day_index_views():
+    # January 2026 starts on a Thursday; the 3rd and 4th are the first weekend
+    table = get_calendar_table(2026, 1, {date(2026, 1, 1), date(2026, 1, 3)})
+
+    assert 0 not in table.non_holiday_days and 2 not in table.non_holiday_days
+    assert len(table.non_holiday_days) == 29
+    assert all(not table.weekend[i] and not table.holiday[i] for i in table.regular_days)
+    assert len(table.regular_days) == 31 - 9 - 1  # 9 weekend days, one weekday holiday
+
+
+def test_weekend_helpers_match_weekday_arithmetic():
+    # August 2026 starts on a Saturday and ends on a Monday, so pairs and
+    # Thursdays cross both month boundaries
+    scheduler = Scheduler(2026, 8, [Person("A", True, True), Person("B", True, True)])
+    dates = scheduler.dates + [date(2026, 7, 31), date(2026, 9, 5), date(2026, 9, 6)]
+
+    for d in dates:
+        assert scheduler._get_weekend_pair(d) == weekend_pair(d), d
+        assert scheduler._get_thursday_for_weekend(d) == comp_thursday(d), d
+    assert scheduler._get_weekend_pair(date(2026, 8, 1)) == date(2026, 8, 2)
+    assert scheduler._get_thursday_for_weekend(date(2026, 8, 1)) == date(2026, 7, 30)
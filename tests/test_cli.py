@@ -0,0 +1,57 @@
+"""Tests for the headless entry points and their shared holiday format."""
+
+from datetime import date
+
+import pandas as pd
+
+import cli
+import run_year
+from schedule_pipeline import _month_holidays
+
+
+def test_month_holidays_accepts_dates_or_app_format():
+    assert _month_holidays("1-2，2026-10-05", 2026, 10) == {
+        date(2026, 10, 1), date(2026, 10, 2), date(2026, 10, 5)
+    }
+    assert _month_holidays("2026-10-05", 2026, 11) == set()
+    assert _month_holidays([date(2026, 1, 1), date(2026, 2, 1)], 2026, 1) == {date(2026, 1, 1)}
+
+
+def test_cli_writes_schedule_and_stats(staff_df, tmp_path, capsys):
+    staff_csv = tmp_path / "staff.csv"
+    staff_df.to_csv(staff_csv, index=False)
+
+    status = cli.main([
+        str(staff_csv), "--year", "2026", "--month", "1", "--holidays", "1",
+        "--attempts", "3", "--seed", "4", "--output-dir", str(tmp_path / "out"),
+    ])
+
+    assert status == 0
+    schedule = pd.read_csv(tmp_path / "out" / "schedule_2026_01.csv", index_col=0)
+    assert list(schedule.index) == staff_df["Name"].tolist()
+    assert (tmp_path / "out" / "stats_2026_01.csv").exists()
+    assert "Seed: 4" in capsys.readouterr().out
+
+
+def test_cli_rejects_infeasible_configuration(staff_df, tmp_path, capsys):
+    staff_csv = tmp_path / "staff.csv"
+    staff_df.iloc[:2].to_csv(staff_csv, index=False)
+
+    status = cli.main([str(staff_csv), "--year", "2026", "--month", "1", "--output-dir", str(tmp_path)])
+
+    assert status == 2
+    assert "No valid schedule exists" in capsys.readouterr().err
+    assert not (tmp_path / "schedule_2026_01.csv").exists()
+
+
+def test_run_year_takes_the_app_holiday_format(staff_df, tmp_path):
+    staff_csv = tmp_path / "staff.csv"
+    staff_df.to_csv(staff_csv, index=False)
+
+    status = run_year.main([
+        str(staff_csv), "--year", "2026", "--months", "2", "--holidays", "2026-02-17,1",
+        "--attempts", "2", "--seed", "1", "--output-dir", str(tmp_path),
+    ])
+
+    assert status == 0
+    assert (tmp_path / "schedule_2026_02.csv").exists()
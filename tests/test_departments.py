@@ -0,0 +1,57 @@
+"""Tests for batch scheduling of several departments."""
+
+import pandas as pd
+
+from schedule_pipeline import load_departments, schedule_departments, summarize_departments
+
+
+def write_departments(staff_df, folder, names=("cardio", "rheuma")):
+    for name in names:
+        staff_df.to_csv(folder / f"{name}.csv", index=False)
+
+
+def test_load_from_directory_and_manifest(staff_df, tmp_path):
+    write_departments(staff_df, tmp_path)
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    departments = load_departments(str(tmp_path))
+    assert [d.name for d in departments] == ["cardio", "rheuma"]
+
+    manifest = tmp_path / "manifest.csv"
+    pd.DataFrame({"Department": ["A"], "StaffCSV": ["cardio.csv"], "DayShifts": [2]}).to_csv(
+        manifest, index=False
+    )
+    (department,) = load_departments(str(manifest))
+    assert department.staff_csv == str(tmp_path / "cardio.csv")
+    assert (department.day_shifts_per_day, department.night_shifts_per_day) == (2, 1)
+
+
+def test_pool_matches_in_process_run(staff_df, tmp_path):
+    write_departments(staff_df, tmp_path)
+    departments = load_departments(str(tmp_path))
+
+    def run(workers):
+        outcomes = schedule_departments(
+            departments, 2026, 3, months=2, num_attempts=3, workers=workers, seed=1
+        )
+        return {department.name: results for department, results in outcomes}
+
+    sequential, pooled = run(1), run(2)
+    assert sorted(pooled) == ["cardio", "rheuma"]
+    for name, results in sequential.items():
+        assert [(r.month, r.success) for r in results] == [(3, True), (4, True)]
+        for a, b in zip(results, pooled[name]):
+            assert a.schedule_df.equals(b.schedule_df)
+
+
+def test_failing_department_does_not_stop_the_batch(staff_df, tmp_path):
+    write_departments(staff_df, tmp_path, names=("ok",))
+    (tmp_path / "broken.csv").write_text("Name,FixedOff\n")  # No staff at all
+
+    outcomes = list(schedule_departments(
+        load_departments(str(tmp_path)), 2026, 3, num_attempts=2, workers=1, seed=1
+    ))
+    summary = summarize_departments(outcomes)
+
+    assert summary["Department"].tolist() == ["broken", "ok"]
+    assert summary["Success"].tolist() == [False, True]
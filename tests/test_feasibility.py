@@ -0,0 +1,55 @@
+"""Tests for the capacity pre-check run before any attempt."""
+
+from datetime import date
+
+from scheduler_logic import Person, Scheduler, ShiftType, create_staff_from_dataframe
+
+
+def test_demo_roster_is_feasible(staff_df):
+    scheduler = Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1))
+    assert scheduler.check_feasibility().feasible
+
+
+def test_real_shortfall_is_reported():
+    scheduler = Scheduler(2026, 1, [Person("A", True, True), Person("B", True, True)])
+    report = scheduler.check_feasibility()
+
+    assert not report.feasible
+    assert "night_window" in {issue.kind for issue in report.issues}
+    assert not scheduler.generate_schedule(num_attempts=3, seed=1)
+
+
+def test_fixed_24h_counts_as_both_slots():
+    # On the 15th everyone is off except P0, whose FixedOn 24h covers Day and Night
+    the_day = date(2026, 1, 15)
+    staff = [
+        Person(
+            f"P{i}", True, True,
+            fixed_off_dates=set() if i == 0 else {the_day},
+            fixed_on_dates={the_day: ShiftType.FULL_24H} if i == 0 else {},
+        )
+        for i in range(10)
+    ]
+    scheduler = Scheduler(2026, 1, staff)
+
+    assert scheduler.check_feasibility().feasible
+    assert scheduler.generate_schedule(num_attempts=5, seed=1)
+
+
+def test_fixed_shifts_are_exempt_from_gap_rules():
+    # Only two night-capable people, with fixed nights every other day between them
+    staff = [
+        Person(
+            f"P{i}", i < 2, True,
+            fixed_on_dates={date(2026, 1, d): ShiftType.NIGHT for d in range(1 + i, 32, 2)},
+        )
+        for i in range(8)
+    ]
+    assert Scheduler(2026, 1, staff).check_feasibility().feasible
+
+
+def test_report_is_computed_once(staff_df):
+    scheduler = Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1))
+    report = scheduler.check_feasibility()
+    scheduler.generate_schedule(num_attempts=2, seed=1)
+    assert scheduler.check_feasibility() is report
@@ -0,0 +1,53 @@
+"""Tests for carrying gap rules and fairness history across months."""
+
+from datetime import date
+
+from scheduler_logic import ScheduleHistory, Scheduler, ShiftType, create_staff_from_dataframe
+
+
+def test_gap_rules_hold_across_month_boundary(staff_df):
+    # Three people worked the last nights of December
+    names = staff_df["Name"].tolist()
+    tail = {(name, date(2025, 12, 29 + i)): ShiftType.NIGHT for i, name in enumerate(names[:3])}
+    history = ScheduleHistory(tail=tail)
+
+    scheduler = Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1), history=history)
+    assert scheduler.generate_schedule(num_attempts=5, seed=1)
+
+    for (name, last), _ in tail.items():
+        nights = [
+            d for (n, d), shift in scheduler.schedule.items()
+            if n == name and shift in (ShiftType.NIGHT, ShiftType.FULL_24H)
+        ]
+        days = [
+            d for (n, d), shift in scheduler.schedule.items()
+            if n == name and shift in (ShiftType.DAY, ShiftType.FULL_24H)
+        ]
+        assert all((d - last).days >= Scheduler.EMERGENCY_NIGHT_TO_NIGHT_GAP for d in nights), name
+        assert all((d - last).days >= Scheduler.MIN_NIGHT_TO_DAY_GAP for d in days), name
+
+
+def test_tail_is_not_counted_in_monthly_stats(staff_df):
+    name = staff_df["Name"][0]
+    history = ScheduleHistory(tail={(name, date(2025, 12, 31)): ShiftType.NIGHT})
+    scheduler = Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1), history=history)
+
+    person = scheduler.staff[name]
+    assert person.total_shifts == 0
+    assert person.last_night_shift == date(2025, 12, 31)
+
+
+def test_export_history_feeds_the_next_month(staff_df):
+    december = Scheduler(2025, 12, create_staff_from_dataframe(staff_df, 2025, 12))
+    assert december.generate_schedule(num_attempts=3, seed=1)
+    history = december.export_history()
+
+    assert history.tail
+    assert min(d for _, d in history.tail) >= date(2025, 12, 25)
+    assert set(history.totals) == set(december.staff)
+
+    january = Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1), history=history)
+    assert january.generate_schedule(num_attempts=3, seed=1)
+    carried = january.export_history()
+    for name, total in history.totals.items():
+        assert carried.totals[name] >= total
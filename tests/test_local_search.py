@@ -0,0 +1,54 @@
+"""Tests for the move/swap local search and the unassign step it relies on."""
+
+from datetime import date
+
+from scheduler_logic import (
+    Person,
+    ScheduleHistory,
+    Scheduler,
+    ShiftType,
+    create_staff_from_dataframe,
+)
+
+
+def test_improve_schedule_keeps_constraints_and_never_worsens(staff_df):
+    scheduler = Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1))
+    assert scheduler.generate_schedule(num_attempts=3, seed=2)
+    before = scheduler._calculate_fairness_score()
+
+    after = scheduler.improve_schedule()
+
+    assert after <= before
+    assert scheduler._validate_coverage()
+    assert scheduler._validate_hard_constraints()[0]
+
+
+def test_unassign_restores_last_shift_dates():
+    person = Person("A", True, True)
+    scheduler = Scheduler(2026, 1, [person, Person("B", True, True)])
+
+    scheduler._assign_shift(person, date(2026, 1, 3), ShiftType.NIGHT)
+    scheduler._assign_shift(person, date(2026, 1, 12), ShiftType.FULL_24H)
+    scheduler._assign_shift(person, date(2026, 1, 8), ShiftType.DAY)
+
+    scheduler._unassign_shift(person, date(2026, 1, 12))
+    assert person.last_night_shift == date(2026, 1, 3)
+    assert person.last_day_shift == date(2026, 1, 8)
+
+    scheduler._unassign_shift(person, date(2026, 1, 8))
+    assert person.last_day_shift is None
+    assert person.last_night_shift == date(2026, 1, 3)
+
+    scheduler._unassign_shift(person, date(2026, 1, 3))
+    assert person.last_night_shift is None
+    assert person.total_shifts == 0
+
+
+def test_unassign_falls_back_to_history_tail():
+    person = Person("A", True, True)
+    history = ScheduleHistory(tail={("A", date(2025, 12, 29)): ShiftType.NIGHT})
+    scheduler = Scheduler(2026, 1, [person, Person("B", True, True)], history=history)
+
+    scheduler._assign_shift(person, date(2026, 1, 6), ShiftType.NIGHT)
+    scheduler._unassign_shift(person, date(2026, 1, 6))
+    assert person.last_night_shift == date(2025, 12, 29)
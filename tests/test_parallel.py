@@ -0,0 +1,30 @@
+"""Sequential and process-pool generation must give the same schedule."""
+
+import pytest
+
+from scheduler_logic import Scheduler, create_staff_from_dataframe
+
+
+def generate(staff_df, month, workers):
+    scheduler = Scheduler(2026, month, create_staff_from_dataframe(staff_df, 2026, month))
+    success = scheduler.generate_schedule(num_attempts=8, workers=workers, seed=11)
+    assignments = sorted(
+        (name, d.isoformat(), shift.value) for (name, d), shift in scheduler.schedule.items()
+    )
+    return success, scheduler.seed, scheduler._calculate_fairness_score(), assignments
+
+
+@pytest.mark.parametrize("rows,month,expected", [(10, 1, True), (7, 2, False)])
+def test_parallel_matches_sequential(staff_df, rows, month, expected):
+    # 7 people in February pass the pre-check, but no attempt reaches full
+    # coverage: both paths must then keep the same (last) failed attempt
+    staff_df = staff_df.iloc[:rows]
+    sequential = generate(staff_df, month, workers=1)
+    parallel = generate(staff_df, month, workers=2)
+
+    assert sequential[0] is expected
+    assert parallel == sequential
+
+
+def test_result_does_not_depend_on_worker_count(staff_df):
+    assert generate(staff_df, 1, workers=2) == generate(staff_df, 1, workers=3)
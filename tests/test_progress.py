@@ -0,0 +1,60 @@
+"""Tests for generation progress reporting and cancellation."""
+
+import pytest
+
+from scheduler_logic import Scheduler, create_staff_from_dataframe
+
+PHASES = {"init", "weekends", "thursdays", "weekdays", "validation", "bound", "done"}
+
+
+def make_scheduler(staff_df):
+    return Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1))
+
+
+def test_every_attempt_is_reported(staff_df):
+    reports = []
+    scheduler = make_scheduler(staff_df)
+    assert scheduler.generate_schedule(num_attempts=6, seed=1, progress=reports.append)
+
+    assert [r.attempt for r in reports] == list(range(1, 7))
+    assert {r.num_attempts for r in reports} == {6}
+    assert {r.phase for r in reports} <= PHASES
+    assert reports[-1].best_score == pytest.approx(scheduler._calculate_fairness_score())
+    assert not scheduler.cancelled
+
+
+def test_parallel_runs_report_per_chunk(staff_df):
+    reports = []
+    make_scheduler(staff_df).generate_schedule(num_attempts=16, workers=2, seed=1, progress=reports.append)
+
+    assert {r.phase for r in reports} == {"batch"}
+    assert reports[-1].attempt == 16
+    assert len(reports) > 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancel_keeps_best_so_far(staff_df, workers):
+    reports = []
+
+    def cancel_after_first_success(report):
+        reports.append(report)
+        return report.best_score is not None
+
+    scheduler = make_scheduler(staff_df)
+    success = scheduler.generate_schedule(
+        num_attempts=200, workers=workers, seed=1, progress=cancel_after_first_success
+    )
+
+    assert scheduler.cancelled
+    assert success
+    assert reports[-1].attempt < 200
+    assert scheduler._validate_coverage()
+
+
+def test_engine_stage_is_reported(staff_df):
+    phases = []
+    make_scheduler(staff_df).generate_schedule(
+        num_attempts=10, seed=1, engine="lns", time_budget_ms=50,
+        progress=lambda report: phases.append(report.phase),
+    )
+    assert phases[-1] == "lns"
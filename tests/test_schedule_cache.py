@@ -0,0 +1,80 @@
+"""Tests for the on-disk schedule cache."""
+
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from schedule_cache import ScheduleCache, generate_cached, schedule_fingerprint
+from scheduler_logic import Scheduler, create_staff_from_dataframe
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ScheduleCache(str(tmp_path))
+
+
+def make_scheduler(staff_df, holidays=()):
+    return Scheduler(2026, 1, create_staff_from_dataframe(staff_df, 2026, 1), holidays=set(holidays))
+
+
+def test_miss_then_hit(staff_df, cache, monkeypatch):
+    first = make_scheduler(staff_df)
+    assert generate_cached(first, cache, num_attempts=3, seed=5)
+    assert len(cache) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hit expected")
+
+    second = make_scheduler(staff_df)
+    monkeypatch.setattr(second, "generate_schedule", fail)
+    assert generate_cached(second, cache, num_attempts=3, seed=5)
+    np.testing.assert_array_equal(first.schedule_matrix, second.schedule_matrix)
+    assert second.seed == first.seed
+    assert second.get_staff_stats() == first.get_staff_stats()
+
+
+def test_changed_inputs_miss(staff_df, cache):
+    generate_cached(make_scheduler(staff_df), cache, num_attempts=3, seed=5)
+    generate_cached(make_scheduler(staff_df), cache, num_attempts=3, seed=6)
+    generate_cached(make_scheduler(staff_df, {date(2026, 1, 1)}), cache, num_attempts=3, seed=5)
+
+    edited = staff_df.copy()
+    edited.loc[0, "FixedOff"] = "20"
+    generate_cached(make_scheduler(edited), cache, num_attempts=3, seed=5)
+    assert len(cache) == 4
+
+
+def test_unseeded_runs_bypass_cache(staff_df, cache):
+    generate_cached(make_scheduler(staff_df), cache, num_attempts=2)
+    assert len(cache) == 0
+
+
+def test_fingerprint_ignores_workers_and_progress(staff_df):
+    scheduler = make_scheduler(staff_df)
+    base = schedule_fingerprint(scheduler, num_attempts=3, seed=5)
+    assert schedule_fingerprint(scheduler, num_attempts=3, seed=5, workers=4) == base
+    assert schedule_fingerprint(scheduler, num_attempts=3, seed=5, progress=print) == base
+    assert schedule_fingerprint(scheduler, num_attempts=4, seed=5) != base
+
+
+@pytest.mark.parametrize("content", [b"", b"PK\x03\x04truncated", b"not a zip file"])
+def test_corrupt_entry_is_a_miss_and_removed(staff_df, cache, content):
+    key = schedule_fingerprint(make_scheduler(staff_df), num_attempts=3, seed=5)
+    with open(cache._path(key), "wb") as f:
+        f.write(content)
+
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+
+    assert generate_cached(make_scheduler(staff_df), cache, num_attempts=3, seed=5)
+    assert cache.get(key) is not None
+
+
+def test_eviction_keeps_newest(staff_df, tmp_path):
+    cache = ScheduleCache(str(tmp_path), max_entries=2)
+    for seed in range(4):
+        generate_cached(make_scheduler(staff_df), cache, num_attempts=1, seed=seed)
+    assert len(cache) == 2
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
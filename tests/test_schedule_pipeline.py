@@ -0,0 +1,46 @@
+"""Tests for multi-month generation."""
+
+from datetime import date
+
+from schedule_pipeline import generate_month, generate_months, month_sequence
+
+
+def test_month_sequence_wraps_year():
+    assert month_sequence(2026, 11, 3) == [(2026, 11), (2026, 12), (2027, 1)]
+
+
+def test_generate_months_chains_history(staff_df):
+    december, january = generate_months(staff_df, 2026, 12, 2, num_attempts=5, seed=2)
+
+    assert [(december.year, december.month), (january.year, january.month)] == [(2026, 12), (2027, 1)]
+    assert december.success and january.success
+    assert [december.seed, january.seed] == [2, 3]
+    for name, total in december.history.totals.items():
+        assert january.history.totals[name] >= total
+
+    # The background thread produces exactly what a plain chain of calls would
+    direct = generate_month(staff_df, 2027, 1, history=december.history, num_attempts=5, seed=3)
+    assert direct.schedule_df.equals(january.schedule_df)
+
+
+def test_staff_table_per_month(staff_df):
+    february = staff_df.copy()
+    february.loc[0, "FixedOff"] = "1-14"
+    tables = {(2026, 1): staff_df, (2026, 2): february}
+
+    results = list(generate_months(tables, 2026, 1, 2, num_attempts=3, seed=1))
+    first = staff_df["Name"][0]
+    assert (results[1].schedule_df.loc[first, [str(day) for day in range(1, 15)]] == "").all()
+
+
+def test_holidays_outside_the_month_are_ignored(staff_df):
+    result = generate_month(
+        staff_df, 2026, 2, holidays=[date(2026, 1, 1), date(2026, 2, 17)], num_attempts=3, seed=1
+    )
+    assert [row["date"] for row in result.coverage if row["is_holiday"]] == [date(2026, 2, 17)]
+
+
+def test_stopping_early_does_not_hang(staff_df):
+    months = generate_months(staff_df, 2026, 1, 12, num_attempts=2, seed=1)
+    assert next(months).month == 1
+    months.close()
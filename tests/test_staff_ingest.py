@@ -0,0 +1,48 @@
+"""Tests for column-wise staff table ingestion and yes/no coercion."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scheduler_logic import create_staff_from_dataframe
+from utils import FALSE_STRINGS, coerce_bool_column
+
+
+@pytest.mark.parametrize("text", sorted(FALSE_STRINGS) + ["FALSE", " No ", "Off", "   "])
+def test_false_strings(text):
+    df = pd.DataFrame({"CanDoNight": [text]}, dtype=object)
+    assert not coerce_bool_column(df, "CanDoNight")[0]
+
+
+@pytest.mark.parametrize("text", ["True", "1", "yes", "y", "on", "x"])
+def test_other_text_is_true(text):
+    df = pd.DataFrame({"CanDoNight": [text]}, dtype=object)
+    assert coerce_bool_column(df, "CanDoNight")[0]
+
+
+def test_non_text_values_and_missing():
+    df = pd.DataFrame({"CanDoNight": [True, False, 0, 1, np.nan, None, pd.NA]}, dtype=object)
+    assert coerce_bool_column(df, "CanDoNight").tolist() == [True, False, False, True, True, False, True]
+    assert coerce_bool_column(df, "CanDoNight", default=False).tolist()[-1] is False
+
+
+def test_missing_column_uses_default():
+    df = pd.DataFrame({"Name": ["A", "B"]})
+    assert coerce_bool_column(df, "CanDo24h").tolist() == [True, True]
+    assert coerce_bool_column(df, "CanDo24h", default=False).tolist() == [False, False]
+
+
+def test_csv_import():
+    csv = (
+        "Name,CanDoNight,CanDo24h,FixedOff,FixedOn\n"
+        " A ,,no,5,\n"
+        "B,False,True,,1:Day\n"
+        "C,yes,,16-31,\n"
+    )
+    staff = create_staff_from_dataframe(pd.read_csv(io.StringIO(csv)), 2026, 1)
+
+    assert [p.name for p in staff] == ["A", "B", "C"]  # Names are stripped
+    assert [(p.can_do_night, p.can_do_24h) for p in staff] == [(True, False), (False, True), (True, True)]
+    assert len(staff[2].fixed_off_dates) == 16
@@ -0,0 +1,43 @@
+"""Tests for the shared FixedOff/FixedOn parser."""
+
+from datetime import date
+
+import pytest
+
+from scheduler_logic import ShiftType, create_staff_from_dataframe
+from utils import parse_date_list, parse_staff_constraints
+
+
+def test_parse_date_list_formats():
+    dates = parse_date_list("1-3，15;2026-01-20, 40, junk", 2026, 1)
+    assert [d.day for d in dates] == [1, 2, 3, 15, 20]
+    assert parse_date_list("nan", 2026, 1) == []
+
+
+def test_parse_is_memoized_and_immutable():
+    first = parse_staff_constraints("5,17-18", "1:Day,3：Night", 2026, 1)
+    assert parse_staff_constraints("5,17-18", "1:Day,3：Night", 2026, 1) is first
+
+    assert first.fixed_off == {date(2026, 1, 5), date(2026, 1, 17), date(2026, 1, 18)}
+    assert first.fixed_on == ((date(2026, 1, 1), "Day"), (date(2026, 1, 3), "Night"))
+    assert first.diagnostics == ()
+    with pytest.raises(AttributeError):
+        first.fixed_off = frozenset()
+
+
+def test_diagnostics():
+    parsed = parse_staff_constraints("5", "5:Day,x:Night,7:Day,7:Night", 2026, 1)
+    messages = " | ".join(parsed.diagnostics)
+    assert "Invalid date format in FixedOn: 'x:Night'" in messages
+    assert "same date(s) in both FixedOff and FixedOn: 01/05" in messages
+    assert "Duplicate date in FixedOn: 01/07" in messages
+
+
+def test_staff_construction_uses_parsed_constraints(staff_df):
+    staff_df = staff_df.copy()
+    staff_df.loc[0, "FixedOn"] = "1:Night,2:24h,3:Evening"
+    person = create_staff_from_dataframe(staff_df, 2026, 1)[0]
+
+    # Unknown shift labels are dropped; valid ones map to ShiftType
+    assert person.fixed_on_dates == {date(2026, 1, 1): ShiftType.NIGHT, date(2026, 1, 2): ShiftType.FULL_24H}
+    assert person.fixed_off_dates == set()
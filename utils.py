@@ -3,30 +3,29 @@ Utility functions for Hospital Shift Scheduling System.
 Handles date operations, data generation, and helper functions.
 """
 
-import calendar
+from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import List, Tuple, Set
+from functools import lru_cache
+from typing import FrozenSet, List, Tuple, Set
+import numpy as np
 import pandas as pd
 
+from calendar_table import get_calendar_table
+
 
 def get_month_dates(year: int, month: int) -> List[date]:
     """Get all dates in a given month."""
-    num_days = calendar.monthrange(year, month)[1]
-    return [date(year, month, day) for day in range(1, num_days + 1)]
+    return list(get_calendar_table(year, month).dates)
 
 
 def get_weekends(year: int, month: int) -> Set[date]:
     """Get all weekend dates (Saturday and Sunday) in a month."""
-    weekends = set()
-    for d in get_month_dates(year, month):
-        if d.weekday() in (5, 6):  # Saturday=5, Sunday=6
-            weekends.add(d)
-    return weekends
+    return set(get_calendar_table(year, month).weekend_dates)
 
 
 def get_thursdays(year: int, month: int) -> List[date]:
     """Get all Thursday dates in a month."""
-    return [d for d in get_month_dates(year, month) if d.weekday() == 3]
+    return list(get_calendar_table(year, month).thursday_dates)
 
 
 def is_weekend(d: date) -> bool:
@@ -140,6 +139,144 @@ def parse_date_list(date_str: str, year: int, month: int) -> List[date]:
     return dates
 
 
+@dataclass(frozen=True)
+class ParsedConstraints:
+    """
+    Parsed FixedOff/FixedOn strings of one staff row, with diagnostics.
+    Instances are shared through the parse cache, so they are immutable.
+    """
+    fixed_off: FrozenSet[date]
+    fixed_on: Tuple[Tuple[date, str], ...]  # (date, shift label) in input order, duplicates kept
+    diagnostics: Tuple[str, ...]            # Problems found, e.g. invalid or conflicting dates
+
+    @property
+    def fixed_on_dates(self) -> Set[date]:
+        return {d for d, _ in self.fixed_on}
+
+
+@lru_cache(maxsize=16384)
+def parse_staff_constraints(
+    fixed_off_str: str, fixed_on_str: str, year: int, month: int
+) -> ParsedConstraints:
+    """
+    Parse a staff row's FixedOff (see parse_date_list) and FixedOn
+    ("date:shift_type", comma-separated) strings for a month.
+    Memoized on the raw strings, so unchanged rows are parsed once.
+    """
+    fixed_off = frozenset(parse_date_list(fixed_off_str, year, month))
+
+    fixed_on = []
+    diagnostics = []
+    if fixed_on_str and fixed_on_str.strip() and fixed_on_str.lower() != "nan":
+        # Normalize separators: Chinese comma/colon to English
+        normalized = fixed_on_str.replace("，", ",").replace("；", ",").replace("：", ":")
+        for part in normalized.split(","):
+            part = part.strip()
+            if ":" not in part:
+                continue
+            date_part, shift_part = part.split(":", 1)
+            date_part = date_part.strip()
+            try:
+                if "-" in date_part:
+                    d = date.fromisoformat(date_part)
+                else:
+                    d = date(year, month, int(date_part))
+            except (ValueError, TypeError):
+                diagnostics.append(f"Invalid date format in FixedOn: '{part}'")
+                continue
+            fixed_on.append((d, shift_part.strip()))
+
+    # Check for conflicts: same date in both FixedOff and FixedOn
+    conflicts = fixed_off & {d for d, _ in fixed_on}
+    if conflicts:
+        conflict_dates = ", ".join(d.strftime("%m/%d") for d in sorted(conflicts))
+        diagnostics.append(f"Date conflict - same date(s) in both FixedOff and FixedOn: {conflict_dates}")
+
+    # Check for duplicate dates in FixedOn (same day assigned twice)
+    seen = set()
+    for d, _ in fixed_on:
+        if d in seen:
+            diagnostics.append(f"Duplicate date in FixedOn: {d.strftime('%m/%d')}")
+        seen.add(d)
+
+    return ParsedConstraints(fixed_off, tuple(fixed_on), tuple(diagnostics))
+
+
+# Text values read as False in the CanDoNight/CanDo24h columns (compared
+# stripped and lowercased)
+FALSE_STRINGS = frozenset({"false", "0", "no", "n", "f", "off", ""})
+
+
+def coerce_bool_column(df: pd.DataFrame, column: str, default: bool = True) -> np.ndarray:
+    """
+    Boolean array for a yes/no staff column. Values convert as bool() would,
+    except text: "false", "0", "no", "n", "f", "off" (any case, surrounding
+    spaces ignored) and blank text, including whitespace-only cells, are False;
+    any other text is True. Missing values keep their bool() meaning (NaN is
+    True, None is False); pd.NA and a missing column give `default`.
+    """
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=bool)
+
+    values = df[column]
+    if values.dtype == bool:
+        return values.to_numpy()
+
+    def to_bool(value) -> bool:
+        if isinstance(value, str):
+            return value.strip().lower() not in FALSE_STRINGS
+        if value is pd.NA:
+            return default
+        return bool(value)
+
+    return np.fromiter(map(to_bool, values.astype(object)), dtype=bool, count=len(values))
+
+
+@dataclass(frozen=True)
+class StaffColumns:
+    """Normalized columns of a staff table, one list entry per row."""
+    names: List[str]
+    fixed_off: List[str]
+    fixed_on: List[str]
+    can_do_night: List[bool]
+    can_do_24h: List[bool]
+
+
+def read_staff_columns(df: pd.DataFrame) -> StaffColumns:
+    """
+    Extract and normalize the staff table columns with vectorized operations
+    (instead of boxing every row with iterrows). Cells are converted with str(),
+    so missing values read as "nan" and are ignored by the parsers.
+    """
+    def text(column: str) -> pd.Series:
+        if column not in df.columns:
+            return pd.Series([""] * len(df), index=df.index, dtype=object)
+        return df[column].map(str)
+
+    # Same separator normalization as parse_date_list / parse_staff_constraints,
+    # done once per column so equivalent strings share a parse cache entry
+    fixed_off = (
+        text("FixedOff")
+        .str.replace("，", ",", regex=False)
+        .str.replace(";", ",", regex=False)
+        .str.replace("；", ",", regex=False)
+    )
+    fixed_on = (
+        text("FixedOn")
+        .str.replace("，", ",", regex=False)
+        .str.replace("；", ",", regex=False)
+        .str.replace("：", ":", regex=False)
+    )
+
+    return StaffColumns(
+        names=text("Name").str.strip().tolist(),
+        fixed_off=fixed_off.tolist(),
+        fixed_on=fixed_on.tolist(),
+        can_do_night=coerce_bool_column(df, "CanDoNight").tolist(),
+        can_do_24h=coerce_bool_column(df, "CanDo24h").tolist(),
+    )
+
+
 def calculate_target_shifts(
     num_staff: int,
     num_days: int,
@@ -157,19 +294,32 @@ def should_increase_day_shifts(avg_shifts: float) -> bool:
 
 
 def create_schedule_dataframe(
-    staff_names: List[str], dates: List[date], schedule: dict
+    staff_names: List[str], dates: List[date], schedule
 ) -> pd.DataFrame:
     """
-    Create a DataFrame from schedule dictionary.
+    Create a DataFrame from a schedule.
 
     Args:
         staff_names: List of staff names
         dates: List of dates in the month
-        schedule: Dict mapping (person, date) -> shift_type
+        schedule: Dict mapping (person, date) -> shift_type, or a staff x day
+            schedule matrix (Scheduler.schedule_matrix) whose rows follow staff_names
 
     Returns:
         DataFrame with staff as rows and dates as columns
     """
+    if isinstance(schedule, np.ndarray):
+        from scheduler_logic import CODE_SHIFTS
+
+        labels = np.array(
+            [""] + [CODE_SHIFTS[code].value for code in sorted(CODE_SHIFTS)], dtype=object
+        )
+        df = pd.DataFrame(
+            labels[schedule], index=staff_names, columns=[f"{d.day}" for d in dates]
+        )
+        df.index.name = "Staff"
+        return df
+
     data = {}
     for d in dates:
         col_name = f"{d.day}"